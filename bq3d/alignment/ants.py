@@ -124,11 +124,8 @@ def transformPoints(points_source, transformDirectory, sink = None, invert = Fal
     pts = io.readPoints(points_source).tolist()
     composite_trans = _compose_transforms(transformDirectory, invert=invert)
 
-    trans_pts = []
-    for i in pts:
-        trans_pts.append(composite_trans.apply_to_point(i))
-
-    res= np.array(trans_pts)
+    apply_to_point = composite_trans.apply_to_point
+    res = np.array([apply_to_point(i) for i in pts])
 
     if isinstance(sink, str):
         return io.writeData(sink, res)
@@ -139,22 +136,23 @@ def _compose_transforms(transformDirectory, invert = False):
     """Strings together transofrm files in the correct order to apply a transform.
     """
     transforms = []
+    files = set(os.listdir(transformDirectory))
     if not invert:
-        if '1Warp.nii.gz' in os.listdir(transformDirectory):
+        if '1Warp.nii.gz' in files:
             SyN_file = os.path.join(transformDirectory, '1Warp.nii.gz')
             field = ants.image_read(SyN_file)
             transform = ants.transform_from_displacement_field(field)
             if transform is None: # Adds compatibility with ANTsPy 2.0+
                 transform = _transform_from_displacement_field(field)
             transforms.append(transform)
-        if '0GenericAffine.mat' in os.listdir(transformDirectory):
+        if '0GenericAffine.mat' in files:
             affine_file = os.path.join(transformDirectory, '0GenericAffine.mat')
             transforms.append(ants.read_transform(affine_file))
     else:
-        if '0GenericAffine.mat' in os.listdir(transformDirectory):
+        if '0GenericAffine.mat' in files:
             affine_file = os.path.join(transformDirectory, '0GenericAffine.mat')
             transforms.append(ants.read_transform(affine_file).invert())
-        if '1InverseWarp.nii.gz' in os.listdir(transformDirectory):
+        if '1InverseWarp.nii.gz' in files:
             inv_file = os.path.join(transformDirectory, '1InverseWarp.nii.gz')
             field = ants.image_read(inv_file)
             transform = ants.transform_from_displacement_field(field)
@@ -27,44 +27,145 @@ def label_props(img, labels, props):
         labels (np.array): labeled image
         props (list): list of strings where each string is the attibute from region_props to export
     Returns:
-       array: label coordinates (list of tuples), intensities (list), sizes (list)
+       list: values of each property in props, for the labels in increasing order. area, centroid, max,
+       max_coord, mean, min and sum are numpy arrays, centroid and max_coord of shape (n, ndim) with one row of
+       coordinates per label. Other properties are lists with one entry per label.
     """
 
-    img = io.readData(img)
-    labels = io.readData(labels)
+    img = _readImage(img)
+    labels = _readImage(labels)
 
     timer = Timer()
     log_parameters(props=props)
 
-    # get label properties
-    regions = region_props(labels, img)
+    _check_images(labels, img)
 
-    # get relavant properties
-    res = []
-    for prop in props:
-        prop_res = []
-        for region in regions:
-            method = getattr(region, prop)
-            prop_res.append(method())
-        res.append(prop_res)
+    # voxel counts, coordinate and intensity sums of all labels in one pass over the labeled voxels, for the
+    # labels present in the image in increasing order, as visited by region_props
+    stats = _label_stats(img, labels, extrema=bool({'max', 'max_coord', 'min'} & set(props)),
+                         max_coords='max_coord' in props)
+    log.info(f'Objects Detected: {len(stats["label"])}')
+
+    # properties from the label statistics are computed for all labels at once, others fall back to the per
+    # region properties
+    res = [_batched_props[prop](img, labels, stats) if prop in _batched_props else [] for prop in props]
+
+    # one pass over the regions for all other properties
+    region_res = [(prop, values) for prop, values in zip(props, res) if prop not in _batched_props]
+    if region_res:
+        areas = dict(zip(stats['label'].tolist(), stats['count'].tolist()))
+        for region in region_props(labels, img, areas=areas):
+            for prop, values in region_res:
+                values.append(getattr(region, prop)())
 
     timer.log_elapsed()
 
     return res
 
 
-def region_props(label_image, intensity_image=None):
-    """ Measure properties of labeled image regions.
-    Similar to skimage.regionprops but more memory efficient by not cacheing of arrays.
+_batched_props = {
+    'area':     lambda img, labels, stats: stats['count'].astype(np.intp),
+    'centroid': lambda img, labels, stats: stats['coords'] / stats['count'][:, np.newaxis],
+    'max':      lambda img, labels, stats: stats['max'],
+    'max_coord': lambda img, labels, stats: stats['max_coord'],
+    'mean':     lambda img, labels, stats: stats['sum'] / stats['count'],
+    'min':      lambda img, labels, stats: stats['min'],
+    'sum':      lambda img, labels, stats: stats['sum'],
+}
+"""label properties computed for all labels at once, as function of (img, labels, label statistics)"""
+
+
+def _label_stats(img, labels, extrema=False, max_coords=False):
+    """Accumulates the voxel count, the sum of the coordinates and the sum of the intensities of each label in a
+    single pass over the labeled voxels. Label values are renumbered to the labels present first, so the cost
+    does not depend on how large the label values are.
 
     Args:
-        label_image (np.ndarray): labeled image
-        intensity_image (np.ndarray): raw image
+        img (np.ndarray): raw image
+        labels (np.ndarray): labeled image
+        extrema (bool): also accumulate the maximum and minimum intensity of each label
+        max_coords (bool): also find the first voxel in C order, as visited by RegionProperties.max_coord, at the
+            maximum intensity of each label. Implies extrema.
+
+    Returns:
+        (dict) arrays with one entry per label present, in increasing order of the label values: 'label' (n,),
+        'count' (n,), 'coords' (n, ndim) and 'sum' (n,), 'max' (n,) and 'min' (n,) if extrema and 'max_coord'
+        (n, ndim) if max_coords.
+    """
+
+    shape = labels.shape
+    nz = np.flatnonzero(labels)
+    index, ids = _compact_labels(labels.ravel()[nz])
+    n = len(ids)
+
+    count = np.bincount(index, minlength=n)
+
+    # the flat indices are sorted, so the first coordinate is repeated over the voxels of each plane and the
+    # others are looked up from the position in the plane
+    plane = int(np.prod(shape[1:]))
+    planes = np.diff(np.searchsorted(nz, np.arange(shape[0] + 1) * plane))
+    in_plane = nz - np.repeat(np.arange(shape[0]) * plane, planes)
+    coords = np.empty((n, len(shape)), dtype=np.float64)
+    coords[:, 0] = np.bincount(index, weights=np.repeat(np.arange(shape[0], dtype=np.float64), planes), minlength=n)
+    for axis, table in enumerate(np.indices(shape[1:], dtype=np.float64).reshape(len(shape) - 1, -1), 1):
+        coords[:, axis] = np.bincount(index, weights=table[in_plane], minlength=n)
+
+    intensities = img.ravel()[nz]
+    sums = np.bincount(index, weights=intensities, minlength=n)
+
+    stats = {'label': ids, 'count': count, 'coords': coords, 'sum': sums}
+    if extrema or max_coords:
+        limits = np.iinfo(img.dtype) if np.issubdtype(img.dtype, np.integer) else np.finfo(img.dtype)
+        stats['max'] = np.full(n, limits.min, dtype=img.dtype)
+        stats['min'] = np.full(n, limits.max, dtype=img.dtype)
+        np.maximum.at(stats['max'], index, intensities)
+        np.minimum.at(stats['min'], index, intensities)
+
+    if max_coords:
+        # the flat indices are in C order, the first voxel of a label at its maximum has the smallest position
+        hit = np.flatnonzero(intensities == stats['max'][index])
+        first = np.full(n, len(nz), dtype=np.intp)
+        np.minimum.at(first, index[hit], hit)
+        stats['max_coord'] = np.stack(np.unravel_index(nz[first], shape), axis=1)
+
+    return stats
+
+
+def _compact_labels(values):
+    """Renumbers label values to 0..n-1 in increasing order of the values
 
     Returns:
-        (list) list of RegionProperties objects for each label
+        (tuple) renumbered values, label values present
     """
 
+    top = int(values.max()) if len(values) else 0
+    if top < max(_lookup_size, 2 * len(values)):
+        # counting the values gives the labels present and a lookup table without sorting them
+        ids = np.flatnonzero(np.bincount(values.astype(np.intp, copy=False), minlength=1))
+        lookup = np.zeros(top + 1, dtype=np.intp)
+        lookup[ids] = np.arange(len(ids))
+        return lookup[values], ids.astype(values.dtype)
+
+    ids, index = np.unique(values, return_inverse=True)
+    return index.ravel(), ids
+
+
+_lookup_size = 1 << 22
+"""largest label value renumbered with a lookup table regardless of the number of labeled voxels"""
+
+
+def _readImage(source):
+    """Arrays are used as they are, files are memory mapped read-only if their format allows it"""
+
+    if isinstance(source, np.ndarray):
+        return source
+    if isinstance(source, str) and io.isMappable(source):
+        return io.readData(source, returnMemmap=True, mode='r')
+    return io.readData(source)
+
+
+def _check_images(label_image, intensity_image=None):
+
     if label_image.ndim not in (2, 3):
         raise TypeError('Only 2d and 3d images are supported.')
 
@@ -75,25 +176,45 @@ def region_props(label_image, intensity_image=None):
     if not np.issubdtype(label_image.dtype, np.integer):
         raise TypeError('Label image must be integer type.')
 
-    regions = []
+
+def region_props(label_image, intensity_image=None, areas=None):
+    """ Measure properties of labeled image regions.
+    Similar to skimage.regionprops but more memory efficient by only cacheing the mask and intensities of a region.
+
+    Args:
+        label_image (np.ndarray): labeled image
+        intensity_image (np.ndarray): raw image
+        areas (np.ndarray or dict): voxel counts indexed by label value, e.g. from np.bincount of the labels, so
+            the area of a region is not counted from its mask
+
+    Returns:
+        (generator) RegionProperties objects for each label, created as they are iterated so a region can be
+        freed once it is processed
+    """
+
+    _check_images(label_image, intensity_image)
+
     objects = ndi.find_objects(label_image)
     log.info(f'Objects Detected: {len(objects)}')
 
+    return _iter_regions(objects, label_image, intensity_image, areas)
+
+
+def _iter_regions(objects, label_image, intensity_image, areas):
+
     for i, sl in enumerate(objects):
         if sl is None:
             continue
 
         label = i + 1
 
-        props = RegionProperties(sl, label, label_image, intensity_image)
-        regions.append(props)
-
-    return regions
+        yield RegionProperties(sl, label, label_image, intensity_image,
+                               area=None if areas is None else int(areas[label]))
 
 
 class RegionProperties(object):
 
-    def __init__(self, im_slice, label, label_image, intensity_image=None):
+    def __init__(self, im_slice, label, label_image, intensity_image=None, area=None):
         """ a Region object that can be used to pull various metrics from a label in an image.
 
         Arguments:
@@ -101,58 +222,92 @@ class RegionProperties(object):
             label (int): value of region corresponding to its label value
             label_image (np.ndarray): full labeled image
             intensity_image (np.ndarray): full intensity image
+            area (int or None): number of voxels of the label if already known
         """
 
         self.label = label  # int of label
         self.slice = im_slice  # bbox
+        self._starts = np.array([sl.start for sl in im_slice], dtype=np.intp)  # global coordinates of the bbox
         self._label_image = label_image[im_slice]
         if isinstance(intensity_image, np.ndarray):
             self._intensity_image = intensity_image[im_slice]
         else:
             self._intensity_image = None
 
+        # computed on first use and shared by all properties
+        self._image = None
+        self._intensities = None
+        self._local_coords = None
+        self._area = area
+
     def area(self):
         """
         Returns:
-            (np.ndarray) labeled global coordinates in [[x,y,z],...]
+            (int) number of voxels of the label
         """
-        return np.sum(self.image())
+        if self._area is None:
+            self._area = np.count_nonzero(self.image())
+        return self._area
 
     def centroid(self):
         """
         Returns:
             (np.ndarray) geometric center in [[x,y,z],...]
         """
-        return tuple(self.coords().mean(axis=0))
+        # center of the mask in the bounding box, without building the coordinates of every voxel
+        com = ndi.center_of_mass(self.image())
+        return tuple(c + sl.start for c, sl in zip(com, self.slice))
 
     def coords(self):
         """
         Returns:
             (np.ndarray) labeled global coordinates in [[x,y,z],...]
         """
-        indices = np.nonzero(self.image())
-        return np.vstack([indices[i] + self.slice[i].start
-                          for i in range(self._label_image.ndim)]).T
+        return self.local_coords() + self._starts
+
+    def local_coords(self):
+        """
+        Returns:
+            (np.ndarray) coordinates of the label in the bbox in [[x,y,z],...], in the order of intensities
+        """
+        if self._local_coords is None:
+            self._local_coords = np.argwhere(self.image())
+        return self._local_coords
 
     def image(self):
         """
         Returns:
             (np.ndarray) Image masked with the correct label.
         """
-        return self._label_image == self.label
+        if self._image is None:
+            self._image = self._label_image == self.label
+        return self._image
+
+    def intensities(self):
+        """
+        Returns:
+            (np.ndarray) intensities of the voxels of the label.
+        """
+        if self._intensities is None:
+            self._intensities = self._intensity_image[self.image()]
+        return self._intensities
 
     def max(self):
-        return np.max(self._intensity_image[self.image()])
+        return np.max(self.intensities())
 
     def max_coord(self):
-        return np.unravel_index(self._intensity_image[self.image()].argmax(), self._intensity_image.shape)
+        """
+        Returns:
+            (tuple) global coordinates of the brightest voxel of the label
+        """
+        return tuple(self.local_coords()[self.intensities().argmax()] + self._starts)
 
     def mean(self):
-        return np.mean(self._intensity_image[self.image()])
+        return np.mean(self.intensities())
 
     def min(self):
-        return np.min(self._intensity_image[self.image()])
+        return np.min(self.intensities())
 
     def sum(self):
-        return np.sum(self._intensity_image[self.image()])
+        return np.sum(self.intensities())
 
@@ -316,7 +316,10 @@ class Atlas(object):
         """
         image = io.readData(labels, returnMemmap = False).astype(int) # to facilitate pooling and speed up
         log.verbose(f'calculating region info from {labels}')
-        properties = region_props(image)
+        # voxel counts of all labels at once, atlas ids can be too large to count them with bincount
+        ids, counts = np.unique(image, return_counts=True)
+        areas = dict(zip(ids.tolist(), counts.tolist()))
+        properties = region_props(image, areas=areas)
 
         # add voxels
         for i,prop in enumerate(properties):
@@ -329,7 +332,7 @@ class Atlas(object):
                 self.regions_by_coord[c] = region
 
         # label value 0 is ignored by region_props
-        self.get_region_by_id(0).add_volume(int(np.sum(image == 0)))
+        self.get_region_by_id(0).add_volume(areas.get(0, 0))
 
         if self.COLLAPSE:
             for region in PostOrderIter(self.tree_root):
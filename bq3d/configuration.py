@@ -15,7 +15,9 @@ or invalid, the defaults will be used. the user name should match the host name.
 """
 
 import os
+import copy
 import socket
+import functools
 import yaml
 from pathlib import Path
 
@@ -57,6 +59,8 @@ class Config(object):
         # set params
         self.processes                = _choose_valid_value(user_conf, default_conf, 'Processing_cores')
         self.thread_ram_max           = _choose_valid_value(user_conf, default_conf, 'Thread_ram_max_Gb')
+        # optional, configs written before this setting existed keep worker processes for the whole run
+        self.max_tasks_per_child      = user_conf.get('Max_tasks_per_child', default_conf.get('Max_tasks_per_child'))
 
         # set file paths
         self.annotations_default_file = _choose_valid_value(user_conf, default_conf, 'Annotations_default', path=True)
@@ -126,19 +130,24 @@ def _choose_valid_value(user: dict, default: dict, param: str, path: bool = Fals
 def read_config(path):
     """ read YAML config given path"""
 
-    # setup path yaml constructor
-    yaml.add_constructor('!pkg_path', _prepend_brainquant3d_path)
-
     # get config file
     conf_file = os.path.join(path, 'brainquant3d.conf')
-    if os.path.isfile(conf_file):
-        with open(os.path.join(path, 'brainquant3d.conf'), 'rt') as f:
-            conf = yaml.load(f.read(), Loader=yaml.Loader)
-    else:
-        with open(os.path.join(path, 'default.conf'), 'rt') as f:
-            conf = yaml.load(f.read(), Loader=yaml.Loader)
+    if not os.path.isfile(conf_file):
+        conf_file = os.path.join(path, 'default.conf')
+
+    # parsed once per version of the file, callers get a copy they can modify
+    return copy.deepcopy(_load_config(conf_file, os.stat(conf_file).st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=4)
+def _load_config(conf_file, mtime):
 
-    return conf
+    with open(conf_file, 'rt') as f:
+        return yaml.load(f.read(), Loader=_ConfigLoader)
+
+
+class _ConfigLoader(getattr(yaml, 'CSafeLoader', yaml.SafeLoader)):
+    """libyaml based safe loader if pyyaml was built with it, with the path constructor of the config files"""
 
 
 def _check_exists(path, create = True):
@@ -169,6 +178,10 @@ def _prepend_brainquant3d_path(loader, node):
     return path
 
 
+# setup path yaml constructor
+_ConfigLoader.add_constructor('!pkg_path', _prepend_brainquant3d_path)
+
+
 def _get_brainquant3dPath():
     """Returns root path to the brainquant3d software
 
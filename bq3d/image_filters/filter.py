@@ -5,6 +5,7 @@ from abc import ABC, abstractmethod
 
 from bq3d.utils.files import unique_temp_dir
 from bq3d.utils.timer import Timer
+from bq3d.utils.logger import VERBOSE
 import logging
 
 from bq3d._version import __version__
@@ -40,14 +41,25 @@ class FilterManager(object):
             filter (filter object): Returns new instance of filter.
         """
 
+        return self.get_filter_class(im_filter)() # return instance of class
+
+    def get_filter_class(self, im_filter):
+        """Returns the class of a filter given its name
+
+        Arguments:
+            im_filter (str): Name of filter. name should equal filter class name.
+        Returns:
+            (class): filter class.
+        """
+
         if im_filter in self._filters:
-            return self._filters[im_filter]() # return instance of class
+            return self._filters[im_filter]
         else:
             raise ValueError(f'{im_filter} filter not found in FilterManager')
 
     def add_filter(self, im_filter):
-        """Adds a filter to the FilterManager. This function should be used to register functions.
-        Registers filters to self._filters.
+        """Adds a filter instance to the FilterManager. Deprecated, use :meth:`add_filter_class` which does not
+        construct a filter to register it.
 
         Arguments:
             im_filter (filter object): Filter to add.
@@ -56,12 +68,25 @@ class FilterManager(object):
         if not isinstance(im_filter, FilterBase):
             raise ValueError('add_filter requires a FilterBase object')
 
-        filter_name = im_filter.__class__.__name__
+        self.add_filter_class(im_filter.__class__)
+
+    def add_filter_class(self, filter_class):
+        """Adds a filter to the FilterManager. This function should be used to register functions.
+        Registers filters to self._filters.
+
+        Arguments:
+            filter_class (class): Filter class to add, subclass of FilterBase.
+        """
 
-        base_class = im_filter.__class__.__bases__[0].__name__
+        if not (isinstance(filter_class, type) and issubclass(filter_class, FilterBase)):
+            raise ValueError('add_filter_class requires a FilterBase subclass')
+
+        filter_name = filter_class.__name__
+
+        base_class = filter_class.__bases__[0].__name__
         if base_class == 'FilterBase': # make sur correct base class
             if not filter_name in self._filters.keys():
-                self._filters[filter_name] = im_filter.__class__
+                self._filters[filter_name] = filter_class
             else:
                 raise ValueError(f'{filter_name} already registered')
         else:
@@ -78,8 +103,12 @@ class FilterBase(ABC):
         temp_dir (bool): temp dir for processing. Set to True for function to create own path.
         name (str): name of filter class.
         log (logger): logger instance to be used for filter
+        in_place (bool): class attribute, True if the filter writes into its input, in memory or through its
+            file name.
     """
 
+    in_place = False
+
     def __init__(self, temp_dir = False):
 
         self.input    = None
@@ -149,6 +178,10 @@ class FilterBase(ABC):
         """prints filter attrubutes to log. Will not print 'output', 'input', 'log' for conciseness.
         """
 
+        # skip formatting the attributes when they would not be logged
+        if not self.log.isEnabledFor(VERBOSE):
+            return
+
         for key,value in self.__dict__.items():
             if key not in ['output', 'input', 'log']:
                 if isinstance(value, np.ndarray):
@@ -166,7 +199,6 @@ class FilterBase(ABC):
                 self.temp_dir = unique_temp_dir(self.name, path=root)
             else:
                 self.temp_dir = unique_temp_dir(self.name)
-            self.temp_dir.mkdir()
             self.log.debug(f'Set temp path {self.temp_dir}')
         return
 
@@ -2,7 +2,10 @@ import cv2
 import numpy as np
 
 import uuid
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
 from bq3d import io
+from bq3d import config
 import bq3d.io.TIF as tif
 from bq3d.image_filters import filter_manager
 from bq3d.image_filters.filter import FilterBase
@@ -28,10 +31,15 @@ class RollingBackgroundSubtract(FilterBase):
     Attributes:
         input (array): 2D or 3D image to pass through filter.
         size (int): Size for the structure element of the morphological opening.
+        threads (int or None): Number of slices processed in parallel. If None, config.processes unless
+            running in a worker process of a pool, where chunks are already processed in parallel.
     """
 
+    in_place = True
+
     def __init__(self):
         self.size = None
+        self.threads = None
         super().__init__()
 
     def _generate_output(self):
@@ -44,17 +52,28 @@ class RollingBackgroundSubtract(FilterBase):
         if len(orig_shape) < 3:
             img = img[np.newaxis, ...]
 
-        # background subtraction in each slice
-        for z in range(img.shape[0]):
-            im = np.array(img[z], dtype=np.dtype(img.dtype).newbyteorder('L'))
+        threads = self.threads
+        if threads is None:
+            threads = 1 if multiprocessing.current_process().daemon else config.processes
+
+        # background subtraction in each slice, the little endian slice is only copied if it is not already
+        def subtract(z):
+            im = np.ascontiguousarray(img[z], dtype=np.dtype(img.dtype).newbyteorder('<'))
             im = cv2.blur(im, (3, 3))
             img[z], _ = subtract_background_rolling_ball(im, self.size)
 
+        if threads > 1:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(subtract, range(img.shape[0])))
+        else:
+            for z in range(img.shape[0]):
+                subtract(z)
+
         img.shape = orig_shape
 
         return self.input
 
-filter_manager.add_filter(RollingBackgroundSubtract())
+filter_manager.add_filter_class(RollingBackgroundSubtract)
 
 
 class BackgroundSubtract(FilterBase):
@@ -74,6 +93,8 @@ class BackgroundSubtract(FilterBase):
             option is 'mean'.
     """
 
+    in_place = True
+
     def __init__(self):
         self.background = None
         self.shift_z = 0
@@ -107,11 +128,13 @@ class BackgroundSubtract(FilterBase):
             img_mean = img.mean()
             bkg_mean = self.background.mean()
             ratio = img_mean / bkg_mean
+            # scaled background of a slice, reused for all slices
+            bkg = np.empty(img.shape[1:], dtype=img.dtype)
             for z in range(img.shape[0]):
-                bkg = (self.background[z] * ratio).astype(img.dtype)
-                sub =  img[z].astype(np.int32) - bkg
-                sub[sub < 0] = 0
-                img[z] = sub
+                np.multiply(self.background[z], ratio, out=bkg, casting='unsafe')
+                # subtract clipped at 0 in place, instead of through a signed copy of the slice
+                np.minimum(bkg, img[z], out=bkg)
+                img[z] -= bkg
         else:
             raise ValueError(f'Method {self.method} not recongnized')
 
@@ -120,7 +143,7 @@ class BackgroundSubtract(FilterBase):
         return self.input
 
 
-filter_manager.add_filter(BackgroundSubtract())
+filter_manager.add_filter_class(BackgroundSubtract)
 
 
 class GaussianSubtract(FilterBase):
@@ -143,6 +166,8 @@ class GaussianSubtract(FilterBase):
         See cv2.GaussianBlur
     """
 
+    in_place = True
+
     def __init__(self):
         self.size = (51, 51)
         self.sigmaX = 0
@@ -167,4 +192,4 @@ class GaussianSubtract(FilterBase):
 
         return img
 
-filter_manager.add_filter(GaussianSubtract())
+filter_manager.add_filter_class(GaussianSubtract)
@@ -1,5 +1,7 @@
+import functools
 import numpy as np
 
+from scipy.ndimage import find_objects
 from scipy.ndimage.morphology import binary_erosion
 
 from bq3d.image_filters import filter_manager
@@ -40,13 +42,28 @@ class Erode(FilterBase):
         if len(orig_shape) < 3:
             img = img[np.newaxis, ...]
 
-        struct = filterKernel(ftype='sphere', size=self.size)
-        data = binary_erosion(img, structure=struct)
+        struct = _sphere(tuple(self.size))
+
+        # the sphere contains its center, so voxels outside the bounding box of the foreground stay 0 and only the
+        # bounding box is eroded, directly into the uint8 output
+        mask = img != 0
+        data = np.zeros(mask.shape, dtype=np.uint8)
+        for sl in find_objects(mask.view(np.uint8)):
+            binary_erosion(mask[sl], structure=struct, output=data[sl])
 
         img.shape = orig_shape
 
-        return data.astype(np.uint8)
+        return data
+
+
+@functools.lru_cache(maxsize=32)
+def _sphere(size):
+    """Boolean spherical structure element, cached as every chunk of a run is eroded with the same size"""
+
+    struct = filterKernel(ftype='sphere', size=size) > 0
+    struct.flags.writeable = False
+    return struct
 
 
-filter_manager.add_filter(Erode())
+filter_manager.add_filter_class(Erode)
 
@@ -57,6 +57,6 @@ class HMax(FilterBase):
         return res
 
 
-filter_manager.add_filter(HMax())
+filter_manager.add_filter_class(HMax)
 
 
@@ -80,7 +80,7 @@ def filterKernel2D(ftype = 'Gaussian', size = (5,5), sigma = None, sigma2 = None
     """    
     
     ftype = ftype.lower()
-    o = structureElementOffsets(size)
+    o = structure_element_offsets(size)
     mo = o.min(axis=1)
     size = numpy.array(size)
 
@@ -218,7 +218,7 @@ def filterKernel3D(ftype = 'Gaussian', size = (5,5,5), sigma = None, sigma2 = No
     """ 
     
     ftype = ftype.lower()
-    o = structureElementOffsets(size)
+    o = structure_element_offsets(size)
     mo = o.min(axis=1)
     size = numpy.array(size)
 
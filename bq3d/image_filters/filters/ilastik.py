@@ -140,7 +140,7 @@ class PixelClassification(FilterBase):
 
         self.run_headless(cmd_args)
 
-        output = io.readData(output_fn)
+        output = io.readData(output_fn, returnMemmap=True)
         output_chan = self.temp_dir / 'out.npy'
         # transpose to restore input dimensionality
         output_chan = io.writeData(output_chan,
@@ -153,4 +153,4 @@ class PixelClassification(FilterBase):
         if not isinstance(self.input, np.memmap):
             raise RuntimeError('Ilastik input must be a memory mapped array')
 
-filter_manager.add_filter(PixelClassification())
+filter_manager.add_filter_class(PixelClassification)
@@ -208,5 +208,5 @@ class IlluminationCorrection(FilterBase):
 
         return flt
 
-filter_manager.add_filter(IlluminationCorrection())
+filter_manager.add_filter_class(IlluminationCorrection)
 
@@ -3,6 +3,11 @@ import cv2
 
 from ._connect import _connect
 
+try:
+    import cc3d
+except ImportError: # optional, only used if requested with use_cc3d
+    cc3d = None
+
 from bq3d._version import __version__
 __author__     = 'Jack Zeitoun, Ricardo Azevedo'
 __copyright__  = "Copyright 2019, Gandhi Lab"
@@ -13,7 +18,7 @@ __email__      = 'ricardo-re-azevedo@gmail.com'
 __status__     = "Development"
 
 
-def connect(image, output):
+def connect(image, output, use_cc3d=False):
     """
     Identify connected components in thresholded 'image'.
 
@@ -23,10 +28,21 @@ def connect(image, output):
         Binary image.
     output: ndarray
         Matrix where values >= 'val' = max(dtype) and values < 'va' = 0.
+    use_cc3d: bool
+        Label 3-D images with cc3d instead of labeling and linking planes with _connect.
+
+    Notes
+    -----
+    With cc3d voxels are connected through faces and edges, which keeps the 8-connectivity within planes of the
+    labeling by planes. The labels can be numbered differently from those of _connect.
     """
 
     if image.ndim == 2:
         _, markers = cv2.connectedComponents(image)
         output[:] = markers
+    elif use_cc3d:
+        if cc3d is None:
+            raise RuntimeError('use_cc3d requires the cc3d package to be installed!')
+        output[:] = cc3d.connected_components(np.asarray(image), connectivity=18)
     else:
         _connect(image, output)
@@ -44,8 +44,11 @@ class Label(FilterBase):
                                 3 : Mode 1 --> Low Thresh --> Label -->
                                       Compare with size filtered and keep overlap --> Size Filter (2nd Pass)
                                 2 : Mode 1 --> Low Thresh --> Watershed --> Size Filter (2nd Pass)
+         use_cc3d       (bool): Label 3d images with cc3d, requires the cc3d package.
     """
 
+    in_place = True # smoothing with sigmas writes into the input
+
     def __init__(self):
         # Defaults
         self.sigmas = None
@@ -56,6 +59,7 @@ class Label(FilterBase):
         self.high_threshold = .7
         self.low_threshold = .2
         self.mode = 2
+        self.use_cc3d = False
         super().__init__(temp_dir=True)
 
     def _generate_output(self):
@@ -97,7 +101,7 @@ class Label(FilterBase):
 
         # Label image
         self.log.debug('Labeling')
-        connect(bin_img, labeled_1_img)
+        connect(bin_img, labeled_1_img, use_cc3d=self.use_cc3d)
 
         # Filter labeled regions by size (1st pass) # Mode 1: Stop after this
         self.log.debug('Size filtering')
@@ -132,7 +136,7 @@ class Label(FilterBase):
             threshold(raw_img, self.low_threshold, bin_img)
 
             self.log.debug('Labeling.')
-            _ = connect(bin_img, labeled_2_img)
+            _ = connect(bin_img, labeled_2_img, use_cc3d=self.use_cc3d)
 
             self.log.debug('Comparing overlap.')
             overlap(labeled_1_img, labeled_2_img, labeled_2_img)
@@ -204,11 +208,13 @@ class LabelBySize(FilterBase):
          output         (array): Filter result.
     """
 
+    in_place = True
+
     def __init__(self):
         super().__init__(temp_dir=True)
 
     def _generate_output(self):
         return label_by_size(self.input, self.input)
 
-filter_manager.add_filter(Label())
-filter_manager.add_filter(LabelBySize())
+filter_manager.add_filter_class(Label)
+filter_manager.add_filter_class(LabelBySize)
@@ -46,5 +46,5 @@ class Max(FilterBase):
 
         return res
 
-filter_manager.add_filter(Max())
+filter_manager.add_filter_class(Max)
 
@@ -49,7 +49,7 @@ class Median(FilterBase):
     def _generate_output(self):
         return median_filter(self.input, self.size)
 
-filter_manager.add_filter(Median())
+filter_manager.add_filter_class(Median)
 
 
 class Median2D(FilterBase):
@@ -65,6 +65,8 @@ class Median2D(FilterBase):
             integer. Default: 3.
     """
 
+    in_place = True
+
     def __init__(self):
         self.size = 3
         super().__init__()
@@ -83,4 +85,4 @@ class Median2D(FilterBase):
 
         return img
 
-filter_manager.add_filter(Median2D())
+filter_manager.add_filter_class(Median2D)
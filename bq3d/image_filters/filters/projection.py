@@ -1,4 +1,3 @@
-import cv2
 import numpy as np
 
 from bq3d import io
@@ -34,43 +33,45 @@ class Project(FilterBase):
         super().__init__()
 
     def _generate_output(self):
-        # extract brain mask
         method = self.method.lower()
-        if self.mask:
-            mask = io.readData(self.mask)
-
         if method == 'max':
-            sink = np.zeros(self.input.shape[1:], dtype=self.input.dtype)
-            if self.mask:
-                for z in range(self.input.shape[0]):
-                    slice  = np.array(self.input[z])
-                    mask_s = np.array(mask[z])
-                    slice[mask_s == 0] = 0
+            reduce, fill = np.maximum.reduce, 0
+        elif method == 'min':
+            reduce, fill = np.minimum.reduce, np.iinfo(self.input.dtype).max
+        else:
+            raise ValueError(f'Method {self.method} not recongnized')
 
-                    sink = cv2.max(sink, slice)
-            else:
-                for z in range(self.input.shape[0]):
-                    sink = cv2.max(sink, self.input[z])
+        sink = np.empty(self.input.shape[1:], dtype=self.input.dtype)
 
-            return sink
+        if self.mask:
+            # extract brain mask
+            mask = io.readData(self.mask)
+
+            # project tiles of rows of all planes, masked voxels of the copy of a tile are set to the fill value
+            # arithmetically, which is faster than indexing the tile with the mask
+            rows = max(1, _tile_bytes // max(1, self.input.shape[0] * self.input.shape[2] * self.input.itemsize))
+            for y in range(0, self.input.shape[1], rows):
+                tile = np.array(self.input[:, y:y + rows])
+                masked = np.asarray(mask[:, y:y + rows]) == 0
+                if method == 'max':
+                    tile *= ~masked
+                elif np.issubdtype(tile.dtype, np.unsignedinteger):
+                    # only leaves the voxels that are not masked unchanged if they can not be negative
+                    np.maximum(tile, np.multiply(masked, fill, dtype=tile.dtype), out=tile)
+                else:
+                    np.copyto(tile, fill, where=masked)
+                reduce(tile, axis=0, out=sink[y:y + rows], initial=fill)
+        else:
+            reduce(self.input, axis=0, out=sink, initial=fill)
 
         if method == 'min':
-            max_v = np.iinfo(self.input.dtype).max
-            sink = np.full(self.input.shape[1:], max_v, dtype=self.input.dtype)
-            if self.mask:
-                for z in range(self.input.shape[0]):
-                    slice  = np.array(self.input[z])
-                    mask_s = np.array(mask[z])
+            sink[sink == fill] = 0
+
+        return sink
 
-                    slice[mask_s == 0] = max_v
 
-                    sink = cv2.min(sink, slice)
-            else:
-                for z in range(self.input.shape[0]):
-                    sink = cv2.min(sink, self.input[z])
-                sink = sink
+_tile_bytes = 64 << 20
+"""size of the tiles of a masked projection"""
 
-            sink[sink == max_v] = 0
-            return sink
 
-filter_manager.add_filter(Project())
+filter_manager.add_filter_class(Project)
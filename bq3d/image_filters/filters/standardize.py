@@ -27,6 +27,8 @@ class Standardize(FilterBase):
         Standardized self.input. If provided as argument, must be of datatype "float".
     """
 
+    in_place = True
+
     def __init__(self):
         super().__init__()
 
@@ -43,4 +45,4 @@ class Standardize(FilterBase):
         return self.input
 
 
-filter_manager.add_filter(Standardize())
+filter_manager.add_filter_class(Standardize)
@@ -31,6 +31,8 @@ class ExtractSurface(FilterBase):
         output (array): Filter result.
     """
 
+    in_place = True
+
     def __init__(self):
         self.threshold      = None
         self.offset_x       = 100
@@ -89,7 +91,7 @@ class ExtractSurface(FilterBase):
 
         return self.input
 
-filter_manager.add_filter(ExtractSurface())
+filter_manager.add_filter_class(ExtractSurface)
 
 def erode(mask, sink, offset_z, offset_x, processes = 1):
     # offset surface in z
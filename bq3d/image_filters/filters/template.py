@@ -28,5 +28,5 @@ class Template(FilterBase):
 
         return None
 
-filter_manager.add_filter(Template())
+filter_manager.add_filter_class(Template)
 
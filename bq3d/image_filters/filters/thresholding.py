@@ -1,8 +1,8 @@
+import numpy as np
+
 from bq3d.image_filters import filter_manager
 from bq3d.image_filters.filter import FilterBase
 
-from .helpers.array_manipulations import min_threshold_3d
-
 from bq3d._version import __version__
 __author__     = 'Ricardo Azevedo, Jack Zeitoun'
 __copyright__  = "Copyright 2019, Gandhi Lab"
@@ -24,17 +24,18 @@ class ThresholdMinimum(FilterBase):
 
     """
 
+    in_place = True
+
     def __init__(self):
         self.min   = 0
         super().__init__()
 
     def _generate_output(self):
-        if len(self.input.shape) == 3:
-            self.input[:] = min_threshold_3d(self.input, self.min)
-            return self.input
-        else:
-            self.input = self.input[self.input < self.min] = 0
-            return self.input
+        # threshold in place one plane at a time, only a mask of a single plane is allocated
+        planes = self.input if self.input.ndim == 3 else self.input[np.newaxis]
+        for plane in planes:
+            np.putmask(plane, plane < self.min, 0)
+        return self.input
 
 
-filter_manager.add_filter(ThresholdMinimum())
+filter_manager.add_filter_class(ThresholdMinimum)
@@ -34,6 +34,17 @@ def filter_image(filter, input, output = None, temp_dir_root=None, **kwargs):
     return im_filter.run()
 
 
+def writes_input(filter):
+    """ True if a filter writes into its input, in memory or through its file name.
+
+    Arguments:
+        filter (str): filter name. string should match filter class name.
+    Returns:
+        (bool): see :attr:`~bq3d.image_filters.filter.FilterBase.in_place`.
+    """
+    return filter_manager.get_filter_class(filter).in_place
+
+
 def set_filter(filter, kwargs):
     """ Instantiates an image filter and passed to it the specified input arguments.
 
@@ -36,10 +36,14 @@ def writePoints(filename, points, **args):
         str: file name
     """
     
-    np.savetxt(filename, points, delimiter=',', newline='\n', fmt='%.5e')
+    _writeArray(filename, points)
     return filename
 
 
+_imagejColumns = ('Slice', 'Y', 'X')
+"""columns of the points in csv files exported by imagej, in z, y, x order"""
+
+
 def readPoints(filename, **args):
     """Read point data to csv file
     
@@ -50,11 +54,12 @@ def readPoints(filename, **args):
     Returns:
         str: file name
     """
-    data = pd.read_csv(filename)
+    # only parse the coordinate columns
+    data = pd.read_csv(filename, usecols=lambda c: c in _imagejColumns, engine='c')
 
     #imagej format
-    if {'Slice', 'Y', 'X'} <= set(data.columns):
-        return np.array([data['Slice'], data['Y'], data['X']]).T
+    if set(_imagejColumns) <= set(data.columns):
+        return data[list(_imagejColumns)].to_numpy()
 
     else:
         raise ValueError(f'could not infer points format from {filename}')
@@ -72,7 +77,24 @@ def writeData(filename, data, **kwargs):
     """
 
     if isinstance(data, np.ndarray):
-        np.savetxt(filename, data, delimiter=',', newline='\n', fmt='%.5e')
+        _writeArray(filename, data)
     if isinstance(data, pd.DataFrame):
         data.to_csv(filename)
     return filename
+
+
+def _writeArray(filename, data, chunksize=65536):
+    """Writes an array as csv, floats as %.5e and integers as %d. Rows are formatted a chunk at a time with a
+    single string formatting instead of one per row as in np.savetxt"""
+
+    data = np.asarray(data)
+    if data.ndim == 1:
+        data = data[:, np.newaxis]
+
+    fmt = '%d' if np.issubdtype(data.dtype, np.integer) else '%.5e'
+    row = ','.join([fmt] * data.shape[1]) + '\n'
+
+    with open(filename, 'w') as f:
+        for i in range(0, data.shape[0], chunksize):
+            chunk = data[i:i + chunksize]
+            f.write((row * chunk.shape[0]) % tuple(chunk.ravel().tolist()))
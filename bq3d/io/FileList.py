@@ -7,7 +7,6 @@ The filename is given as regular expression as described
 import numpy
 import os
 import re
-from pathlib import Path
 import tifffile as tif
 import multiprocessing
 
@@ -145,7 +144,9 @@ def getDataType(filename):
     Returns:
         dtype: data type
     """
-    return io.readData(filename, z=0).dtype
+    # from the header of the first file instead of reading its image
+    fp, fl = readFileList(filename)
+    return io.getDataType(os.path.join(fp, fl[0]))
 
 
 def readDataFiles(filename, x = None, y = None, z = None, **args):
@@ -205,13 +206,14 @@ def empty(filename, shape, dtype, **kwargs):
         io.empty(fname, shape[:-1], dtype)
 
 
-def writeData(filename, data, startIndex = 0, rgb = False, substack = None, **kwargs):
+def writeData(filename, data, startIndex = 0, rgb = False, substack = None, dropCache = False, **kwargs):
     """Write image stack to single or multiple image files
     
     Arguments:
         filename (str): file name as regular expression
         data (array): image data
         startIndex (int): index of first z-slice
+        dropCache (bool): drop the written files from the page cache, see :func:`bq3d.io.TIF.writeData`
     
     Returns:
         str: file name as regular expression
@@ -223,10 +225,12 @@ def writeData(filename, data, startIndex = 0, rgb = False, substack = None, **kw
     # check for the \d{xx} part of the regular expression -> if not assume file header
     fileheader, fileext, digitfrmt = splitFileExpression(filename)
     d = data.ndim
+    # only passed on if set, not all formats of the files support it
+    args = {'dropCache': True} if dropCache else {}
 
     if d == 2:
         fname = fileheader + (digitfrmt % startIndex) + fileext
-        io.writeData(fname, data, substack=substack)
+        io.writeData(fname, data, substack=substack, **args)
         return fname
     else:
 
@@ -240,14 +244,14 @@ def writeData(filename, data, startIndex = 0, rgb = False, substack = None, **kw
         if rgb:
             if nz == 3:
                 fname = fileheader + (digitfrmt % startIndex) + fileext
-                io.writeData(fname, data, rgb=True, substack=substack)
+                io.writeData(fname, data, rgb=True, substack=substack, **args)
                 return fname
             else:
                 raise RuntimeError('Image does not have correct dimensionality for RGB. format should be XYS')
         else:
             for i in range(nz):
                 fname = fileheader + (digitfrmt % (i + startIndex)) + fileext
-                io.writeData(fname, data[i], substack=substack)
+                io.writeData(fname, data[i], substack=substack, **args)
             return filename
 
 
@@ -266,35 +270,28 @@ def copyData(source, sink, processes = 1, x = None, y = None, z = None, **kwargs
         TODO: could simplify by not splitting up the regex files
     """
 
-    if isinstance(source, Path):
-        source = source.as_posix()
-    if isinstance(sink, Path):
-        sink = sink.as_posix()
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    if isinstance(sink, os.PathLike):
+        sink = os.fspath(sink)
 
     fp, fl = readFileList(source, z = z) # crops is z by only reading files in range
     out_type = io.dataFileNameToType(sink)
 
     if out_type == 'FileList':
-        # setup inputs for pool
-        files = []
-        z_idx = []
-        for i,fn in enumerate(fl):
-            files.append(os.path.join(fp, fn))
-            z_idx.append(i)
-
-        f_chunks  = [files[i::processes] for i in range(processes)]
-        z_chunks  = [z_idx[i::processes] for i in range(processes)]
-
-
-        # setup pool
-        args = [(sources, z_chunks[i], sink, x, y) for i,sources in enumerate(f_chunks)]
+        # one task per file so workers stay balanced when file sizes differ
+        args = [(os.path.join(fp, fn), i, sink, x, y) for i, fn in enumerate(fl)]
 
         if processes == 1:
-            _parallelCopyToFileList(*args)
+            for a in args:
+                _parallelCopyToFileList(a)
         else:
+            chunksize = max(1, len(args) // (processes * 4))
             pool = multiprocessing.Pool(processes)
-            pool.map(_parallelCopyToFileList, args)
+            for _ in pool.imap_unordered(_parallelCopyToFileList, args, chunksize=chunksize):
+                pass
             pool.close()
+            pool.join()
 
     elif out_type == 'TIF':
         # get datasize
@@ -304,7 +301,7 @@ def copyData(source, sink, processes = 1, x = None, y = None, z = None, **kwargs
         Ysize = io.toDataSize(Ysize, r=y)
         Zsize = io.toDataSize(Zsize, r=z)
         # setup inputs for pool
-        data_type   = getDataType(os.path.join(fp, fl[0]))
+        data_type   = io.getDataType(os.path.join(fp, fl[0]))
         files       = [os.path.join(fp, i) for i in fl]
         idxs        = list(range(len(files)))
         z_f_chunks  = [files[i::processes] for i in range(processes)]
@@ -323,27 +320,46 @@ def copyData(source, sink, processes = 1, x = None, y = None, z = None, **kwargs
     return sink
 
 def _parallelCopyToFileList(args):
-    """copies FileList to FileList in parallel"""
-    sources, source_idxs, sink, Xrng, Yrng = args
+    """copies a single file of a FileList to FileList"""
+    file, idx, sink, Xrng, Yrng = args
 
-    for i,file in enumerate(sources):
-        log.debug(f'copyData: copying {file} to {sink}')
-        im = tif.imread(file)
-        if not Xrng == Yrng == None:
-            im = io.dataToRange(im, x=Xrng, y=Yrng)
+    log.debug(f'copyData: copying {file} to {sink}')
+    _prefetch(file)
+    im = tif.imread(file)
+    if not Xrng == Yrng == None:
+        im = io.dataToRange(im, x=Xrng, y=Yrng)
 
-        io.writeData(sink, im, startIndex = source_idxs[i])
+    io.writeData(sink, im, startIndex = idx)
 
 def _parallelCopyToTif(args):
     """copies FileList to Tif in parallel"""
     sources, idxs, sink, Xrng, Yrng = args
     output = io.readData(sink)
 
+    if sources:
+        _prefetch(sources[0])
+
     for i, idx in enumerate(idxs):
         file = sources[i]
+        if i + 1 < len(sources):
+            _prefetch(sources[i + 1]) # read next file ahead while copying this one
         log.debug(f'copyData: copying {file} to {sink}')
-        im = tif.imread(file)
+        try:
+            im = tif.tifffile.memmap(file, mode='r') # copy straight from the page cache
+        except ValueError: # compressed files can not be memory mapped
+            im = tif.imread(file)
         if not Xrng == Yrng == None:
-            output[idx] = io.dataToRange(im, x=Xrng, y=Yrng)
-        else:
-            output[idx] = im
+            im = io.dataToRange(im, x=Xrng, y=Yrng)
+        numpy.copyto(output[idx], im)
+
+
+def _prefetch(file):
+    """asks the kernel to start reading a file into the page cache, no-op where posix_fadvise is not available"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+
+    fd = os.open(file, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
@@ -23,7 +23,6 @@ import shutil
 import numpy as np
 
 from bq3d import io
-import imp
 
 import logging
 
@@ -39,28 +38,67 @@ __status__     = "Development"
 log = logging.getLogger(__name__)
 
 def writePoints(filename, data, returnMemmap = False, **args):
-    np.save(filename, data)
-    if returnMemmap:
-        data = np.load(filename, mmap_mode='r+')
-        return data
-    else:
-        return filename
+    return _save(filename, data, returnMemmap = returnMemmap)
+
+
+def readPoints(filename, returnMemmap = False, mode = 'r', **args):
+    """Read point data from npy file
 
+    Arguments:
+        filename (str): file name
+        returnMemmap (bool): return a memory map of the file
+        mode (str): mode of the memory map, 'r+' to write changes of the points back to the file
+        args: arguments for :func:`~bq3d.io.pointsToRange`
 
-def readPoints(filename, **args):
-    data = np.load(filename, mmap_mode='r+')
+    Returns:
+        array: point data
+    """
+    data = _load(filename, returnMemmap = returnMemmap, mode = mode, **args)
     return io.pointsToRange(data, **args)
 
 def writeData(filename, data, returnMemmap = False, **args):
+    return _save(filename, data, returnMemmap = returnMemmap)
+
+
+def readData(filename, returnMemmap = False, mode = 'r', **args):
+    """Read data from npy file
+
+    Without a range the whole array is loaded into memory. With a range the file is
+    memory mapped read-only so only the requested part is read from disk. Changes to the
+    result only reach the file for a memory map opened with returnMemmap=True and mode='r+'.
+
+    Arguments:
+        filename (str): file name
+        returnMemmap (bool): return a memory map of the file
+        mode (str): mode of the memory map, 'r+' to write changes of the data back to the file
+        x,y,z (tuple): data range specifications
 
-    np.save(filename, data)
+    Returns:
+        array: data
+    """
+    data = _load(filename, returnMemmap = returnMemmap, mode = mode, **args)
+    return io.pointsToRange(data, **args)
+
+
+def _load(filename, returnMemmap = False, mode = 'r', x = None, y = None, z = None, **args):
+    """Load npy file, memory mapping it only when a memmap or a sub range is requested"""
     if returnMemmap:
-        data = np.load(filename, mmap_mode='r+')
-        return data
+        return np.load(filename, mmap_mode=mode)
+    elif x is None and y is None and z is None:
+        return np.load(filename)
     else:
-        return filename
+        return np.load(filename, mmap_mode='r')
 
 
-def readData(filename, **args):
-    data = np.load(filename, mmap_mode='r+')
-    return io.pointsToRange(data, **args)
+def _save(filename, data, returnMemmap = False):
+    """Save array to npy file, writing through a memmap that is returned if returnMemmap is True"""
+    if returnMemmap:
+        data_map = np.lib.format.open_memmap(filename, mode='w+', dtype=data.dtype, shape=data.shape)
+        data_map[:] = data
+        data_map.flush()
+        return data_map
+    else:
+        # arrays of points or images only, no pickled objects
+        with open(filename, 'wb', buffering=1 << 20) as f:
+            np.save(f, data, allow_pickle=False)
+        return filename
@@ -14,13 +14,13 @@ Example:
 #:license: GNU, see LICENSE.txt for details.
 
 import os
+import shutil
 import numpy
 
 import vtk
 from vtk.util.numpy_support import vtk_to_numpy
 
 from bq3d import io
-import imp
 
 import logging
 
@@ -102,20 +102,11 @@ def readData(filename, x = None, y = None, z = None):
 
     sc = im.GetPointData().GetScalars()
     img = vtk_to_numpy(sc)
-    
-    dims = list(dims)
-    dims[0:3] = [dims[2], dims[1], dims[0]]
-
-    imgs = list(img.shape)
-    if len(imgs) > 1:
-        imgs.pop(0)
-        dims = dims + imgs
 
-    img = img.reshape(dims)
-    #img = img.transpose([1,2,0])
-    tp = [2,1,0]
-    tp = tp + [i for i in range(3, len(dims))]
-    img = img.transpose(tp)
+    # vtk stores x fastest: view the buffer as (z,y,x[,c]) and swap the spatial axes without copying
+    shape = tuple(dims[::-1]) + img.shape[1:]
+    tp = (2, 1, 0) + tuple(range(3, len(shape)))
+    img = img.reshape(shape).transpose(tp)
 
     return io.dataToRange(img, x = x, y = y, z = z)
 
@@ -164,21 +155,18 @@ def writeRawData(filename, data):
         str: file name of raw file
     """   
     
-    rawfile = open(filename,'wb')
     d = len(data.shape)
-    if d <= 2:
-        #data.tofile(rawfile)
-        data.transpose([1,0]).tofile(rawfile)
-    elif d == 3:
-        #data.transpose([2,0,1]).tofile(rawfile)
-        data.transpose([2,1,0]).tofile(rawfile)
-    elif d== 4:
-        #data.transpose([3,2,0,1]).tofile(rawfile)
-        data.transpose([3,2,1,0]).tofile(rawfile)
-    else:
+    if d > 4:
         raise RuntimeError('writeRawData: image dimension %d not supported!' % d)
 
-    rawfile.close()
+    # raw files store the first axis fastest, i.e. the data in fortran order
+    with open(filename, 'wb', buffering = 1 << 20) as rawfile:
+        if data.flags.f_contiguous:
+            data.T.tofile(rawfile)
+        else:
+            # transpose one slab of the slowest on-disk axis at a time to bound memory
+            for i in range(data.shape[-1]):
+                numpy.ascontiguousarray(data[..., i].T).tofile(rawfile)
 
     return filename
 
@@ -271,7 +259,7 @@ def copyData(source, sink, **kwargs):
             raise RuntimeError('copyData: {} to {} not supported'.format(sourceExt, sinkExt))
 
         for i in range(2):
-            io.copyFile(sources[i], sinks[i])
+            shutil.copyfile(sources[i], sinks[i])
 
         return sink
 
@@ -302,7 +290,7 @@ def copyData(source, sink, **kwargs):
             raise RuntimeError('copyData: {} to {} not supported'.format(sourceExt, sinkExt))
 
         for i in range(2):
-            io.copyFile(sources[i], sinks[i])
+            shutil.copyfile(sources[i], sinks[i])
 
         return sink
 
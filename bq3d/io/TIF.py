@@ -1,4 +1,6 @@
 import os
+import mmap
+import functools
 import shutil
 import numpy as np
 import tifffile as tif
@@ -29,8 +31,7 @@ def dataSize(filename, **args):
         tuple: data size
     """
 
-    t = tif.tifffile.memmap(filename)
-    s = t.shape
+    s = _probe(filename)[0]
 
     return io.dataSizeFromDataRange(s, **args)
 
@@ -45,14 +46,12 @@ def dataZSize(filename, z = None):
     Returns:
         int: z data size
     """
-    
-    t = tif.TiffFile(filename)
 
-    d2 = t.pages[0].shape
+    _, _, d2, d3 = _probe(filename)
+
     if len(d2) == 3:
       return io.toDataSize(d2[0], r = z)
 
-    d3 = len(t.pages)
     if d3 > 1:
         return io.toDataSize(d3, r = z)
     else:
@@ -67,24 +66,81 @@ def getDataType(filename):
     Returns:
         dtype: data type
     """
-    return io.readData(filename).dtype
+    return _probe(filename)[1]
+
+
+def _probe(filename):
+    """Shape and dtype of the image, shape of the first page and number of pages of a tif, the header is only
+    parsed again if the file changed"""
+
+    st = os.stat(filename)
+    return _readHeader(os.path.abspath(filename), st.st_mtime_ns, st.st_size)
+
 
+@functools.lru_cache(maxsize=256)
+def _readHeader(filename, mtime, size):
 
-def readData(filename, x = None, y = None, z = None, returnMemmap = True, **kwargs):
+    with tif.TiffFile(filename) as t:
+        series = t.series[0]
+        return series.shape, series.dtype, t.pages[0].shape, len(t.pages)
+
+
+def readData(filename, x = None, y = None, z = None, returnMemmap = True, access = None, **kwargs):
     """Read data from a single tif image or stack
     
     Arguments:
         filename (str): file name as regular expression
         x,y,z (tuple): data range specifications
+        access (str or None): 'sequential', 'random' or 'willneed', hints the kernel how a memory mapped file
+            will be read, e.g. to read ahead of sequential passes. Ignored where not supported.
     
     Returns:
         array: image data
     """
 
     if returnMemmap:
-        data = tif.tifffile.memmap(filename, **kwargs)
+        try:
+            data = tif.tifffile.memmap(filename, **kwargs)
+        except ValueError: # compressed tifs can not be memory mapped
+            return _readPages(filename, x = x, y = y, z = z)
+        if access:
+            _adviseAccess(data, access)
     else:
-        data = tif.imread(filename)
+        return _readPages(filename, x = x, y = y, z = z)
+
+    return io.dataToRange(data, x = x, y = y, z = z)
+
+
+_accessAdvice = {'sequential': 'MADV_SEQUENTIAL', 'random': 'MADV_RANDOM', 'willneed': 'MADV_WILLNEED'}
+"""access patterns of readData to the madvise constant hinting them"""
+
+
+def _adviseAccess(data, access):
+    """Passes the access pattern of a memory mapped file to the kernel, where the platform supports it"""
+
+    if access not in _accessAdvice:
+        raise ValueError('access {} not recognized, use one of {}'.format(access, list(_accessAdvice)))
+
+    advice = getattr(mmap, _accessAdvice[access], None)
+    if advice is None or not isinstance(data.base, mmap.mmap) or not hasattr(data.base, 'madvise'):
+        return
+    try:
+        data.base.madvise(advice)
+    except OSError:
+        log.debug('madvise not supported for {}'.format(data.filename))
+
+
+def _readPages(filename, x = None, y = None, z = None):
+    """Decode tif into memory, only decoding the pages in the z range for stacks of 2d pages"""
+
+    with tif.TiffFile(filename) as t:
+        shape = t.series[0].shape
+        if z is not None and len(shape) == 3 and len(t.pages) == shape[0]:
+            rz = io.toDataRange(shape[0], r = z)
+            if rz[1] > rz[0]:
+                data = t.asarray(key = range(rz[0], rz[1]))
+                return io.dataToRange(data, x = x, y = y)
+        data = t.asarray()
 
     return io.dataToRange(data, x = x, y = y, z = z)
 
@@ -94,7 +150,7 @@ def empty(filename, shape, dtype, **kwargs):
     return tif.tifffile.memmap(filename, shape=shape, dtype=dtype, **kwargs)
 
 
-def writeData(filename, data, rgb = False, substack = None, returnMemmap = True):
+def writeData(filename, data, rgb = False, substack = None, returnMemmap = True, compression = None, dropCache = False):
     """Write image data to tif file
     
     Arguments:
@@ -102,6 +158,10 @@ def writeData(filename, data, rgb = False, substack = None, returnMemmap = True)
         data (array): image data in x,y,z
         rgb (bool): if true will save RGB image. channels should be last array axis
         returnMemmap (bool): returns array rather than file name
+        compression (str or None): 'zstd' or 'zlib' to write a compressed tif. Integer data is
+            delta encoded before compression. Compressed tifs can not be memory mapped.
+        dropCache (bool): advise the kernel to drop the pages of the file from the page cache once written, for
+            files that are not read again soon.
     Returns:
         str or np.array: output file name or memory mapped array
     """
@@ -110,17 +170,39 @@ def writeData(filename, data, rgb = False, substack = None, returnMemmap = True)
     d = len(data.shape) # fiji wants 'TZCYXS'
     dtype = data.flat[0].dtype
 
-    if substack:
+    if compression:
+        if substack:
+            raise RuntimeError('writing substacks to compressed tif not supported!')
+        predictor = np.issubdtype(dtype, np.integer)
+        codec, level = _compressionArgument(compression)
+        try:
+            tif.imwrite(fn, data, bigtiff = d > 2, compression = codec, compressionargs = {'level': level},
+                        predictor = predictor)
+        except TypeError: # tifffile before 2022.7 takes the codec and level as compress
+            tif.imwrite(fn, data, bigtiff = d > 2, compress = (codec.upper(), level), predictor = predictor)
+        shutil.move(fn, filename)
+
+    elif substack:
         sub = range_to_slices(substack)
         data_map = io.readData(filename)
         data_map[sub] = data
+        if dropCache:
+            data_map.flush()
+
+    elif not rgb and _isTifMap(data):
+        # the data is a tif on disk, copy the file instead of the data through both mappings
+        io.copyFile(data.filename, fn)
+        shutil.move(fn, filename)
+        data_map = np.squeeze(readData(filename)) if returnMemmap else None
 
     else:
+        # classic tifs address up to 4 GB, leave room for the headers of the pages
+        bigtiff = data.nbytes > _classicTiffSize
         if not rgb:
             if d == 2: # XY
-                data_map = tif.tifffile.memmap(fn, dtype=dtype, shape=data.shape)
+                data_map = tif.tifffile.memmap(fn, dtype=dtype, shape=data.shape, bigtiff = bigtiff)
             elif d == 3: # XYZ
-                data_map = tif.tifffile.memmap(fn, dtype=dtype, shape=data.shape, bigtiff = True) #imageJ = true not work for int32
+                data_map = tif.tifffile.memmap(fn, dtype=dtype, shape=data.shape, bigtiff = bigtiff) #imageJ = true not work for int32
             elif d == 4: #XYZC
                 data_map = tif.tifffile.memmap(fn, dtype=dtype, shape=data.shape, imagej = True)
             else:
@@ -133,15 +215,88 @@ def writeData(filename, data, rgb = False, substack = None, returnMemmap = True)
             else:
                 raise RuntimeError('writing {} dimensional data to tif not supported!'.format(len(data.shape)))
 
-        data_map[:] = data
+        if data_map.shape == data.shape:
+            # copy in chunks of planes written back one at a time, bounding the dirty pages of the mapping
+            step = max(1, _writeChunkSize // max(1, data.nbytes // max(1, data.shape[0])))
+            for z in range(0, data.shape[0], step):
+                data_map[z:z + step] = data[z:z + step]
+                data_map.flush()
+        else:
+            data_map[:] = data
         shutil.move(fn, filename)
+        data_map.filename = os.path.abspath(filename) # mapping stays valid after the move
+        data_map = np.squeeze(data_map)
+
+    if dropCache:
+        _dropCache(filename)
 
     if returnMemmap:
-        return readData(filename)
+        if compression:
+            return readData(filename)
+        return data_map
     else:
         return filename
 
 
+def _dropCache(filename):
+    """Advises the kernel to drop the cached pages of a file, starting the write back of dirty ones, where the
+    platform supports it"""
+
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        log.debug('posix_fadvise not supported for {}'.format(filename))
+    finally:
+        os.close(fd)
+
+
+_classicTiffSize = 2**32 - 2**25
+"""largest image written to a classic tif, larger images are written as bigtiff"""
+
+_writeChunkSize = 1 << 28
+"""bytes copied into a new tif before they are flushed to disk"""
+
+
+def _isTifMap(data):
+    """True if data is all of the image mapped from a tif file, in the order of the file, and does not differ from
+    the file"""
+
+    if not (isinstance(data, np.memmap) and data.mode in ('r', 'r+') and data.filename is not None
+            and os.path.splitext(data.filename)[1].lower() in ('.tif', '.tiff')):
+        return False
+
+    # the map of the file the views of readData are taken from
+    root = data
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    if not isinstance(root.base, mmap.mmap):
+        return False
+
+    return (data.flags.c_contiguous and data.shape == np.squeeze(root).shape and data.dtype == root.dtype
+            and data.__array_interface__['data'][0] == root.__array_interface__['data'][0])
+
+
+def _compressionArgument(compression):
+    """Converts a compression name to the tifffile codec and level, falling back to zlib if zstd is not available"""
+
+    if compression == 'zstd':
+        try:
+            import imagecodecs
+            if hasattr(imagecodecs, 'zstd_encode'):
+                return 'zstd', 1
+        except ImportError:
+            pass
+        log.warning('zstd codec not available, writing tif with zlib compression')
+        return 'zlib', 6
+    elif compression == 'zlib':
+        return 'zlib', 6
+    else:
+        raise ValueError('tif compression {} not supported!'.format(compression))
+
+
 def copyData(source, sink, x=None, y=None, z=None, returnMemmap=False):
     """Copy a data file from source to sink
     
@@ -156,18 +311,12 @@ def copyData(source, sink, x=None, y=None, z=None, returnMemmap=False):
     if out_type == 'TIF':
         if isinstance(source, np.memmap) and x==y==y==z==None:
             shutil.copyfile(source.filename, sink)
+            if returnMemmap:
+                return io.readData(sink)
+            return sink
         else:
-            Xsize, Ysize, Zsize = io.dataSize(source)
-            # cropped size
-            Xsize = io.toDataSize(Xsize, r=x)
-            Ysize = io.toDataSize(Ysize, r=y)
-            Zsize = io.toDataSize(Zsize, r=z)
+            # a memory mapped source is only read in the cropped range, writeData returns the map of the sink
             im = io.readData(source, x=x, y=y, z=z)
-            out = io.writeData(sink, im, returnMemmap=returnMemmap)
-
-        if returnMemmap:
-            return io.readData(sink)
-        else:
-            return sink
+            return io.writeData(sink, im, returnMemmap=returnMemmap)
     else:
         raise RuntimeError('copying from TIF to {} not yet supported.'.format(out_type))
@@ -47,35 +47,35 @@ def writePoints(filename, points, labelImage = None):
         if isinstance(labelImage, str):
             labelImage = io.readData(labelImage)
 
+        # bounds check and label lookup for all points at once
         dsize = labelImage.shape
-        for i in range(nPoint):
-            if 0 <= x[i] < dsize[0] and 0 <= y[i] < dsize[1] and 0 <= z[i] < dsize[2]:
-                 pointLabels[i] = labelImage[x[i], y[i], z[i]]
+        inside = (0 <= x) & (x < dsize[0]) & (0 <= y) & (y < dsize[1]) & (0 <= z) & (z < dsize[2])
+        xi = x[inside].astype(numpy.intp)
+        yi = y[inside].astype(numpy.intp)
+        zi = z[inside].astype(numpy.intp)
+        pointLabels[inside] = labelImage[xi, yi, zi]
 
-    #write VTK file
-    vtkFile = file(filename, 'w')
-    vtkFile.write('# vtk DataFile Version 2.0\n')
-    vtkFile.write('Unstructured Grid Example\n')
-    vtkFile.write('ASCII\n')
-    vtkFile.write('DATASET UNSTRUCTURED_GRID\n')
-    vtkFile.write("POINTS " + str(nPoint) + " float\n")
-    for iPoint in range(nPoint):
-        vtkFile.write(str(x[iPoint]).format('%05.20f') + " " +  str(y[iPoint]).format('%05.20f') + " " + str(z[iPoint]).format('%05.20f') + "\n")
+    #write binary VTK file, binary legacy data is big endian
+    cells = numpy.empty((nPoint, 2), dtype='>i4')
+    cells[:, 0] = 1
+    cells[:, 1] = numpy.arange(nPoint)
 
-    vtkFile.write("CELLS " + str(nPoint) + " " + str(nPoint * 2) + "\n")
-
-    for iPoint in range(nPoint):
-        vtkFile.write("1 " + str(iPoint) + "\n")
-    vtkFile.write("CELL_TYPES " + str(nPoint) + "\n")
-    for iPoint in range(0, nPoint):
-        vtkFile.write("1 \n")
-    vtkFile.write("POINT_DATA " + str(nPoint) + "\n")
-    vtkFile.write('SCALARS scalars float 1\n')
-    vtkFile.write("LOOKUP_TABLE default\n")
-    for iLabel in pointLabels:
-        vtkFile.write(str(int(iLabel)) + " ")
-    vtkFile.write("\n")
-    vtkFile.close()
+    with open(filename, 'wb') as vtkFile:
+        vtkFile.write(b'# vtk DataFile Version 2.0\n')
+        vtkFile.write(b'Unstructured Grid Example\n')
+        vtkFile.write(b'BINARY\n')
+        vtkFile.write(b'DATASET UNSTRUCTURED_GRID\n')
+        vtkFile.write(('POINTS %d float\n' % nPoint).encode())
+        vtkFile.write(numpy.column_stack((x, y, z)).astype('>f4').tobytes())
+        vtkFile.write(('\nCELLS %d %d\n' % (nPoint, nPoint * 2)).encode())
+        vtkFile.write(cells.tobytes())
+        vtkFile.write(('\nCELL_TYPES %d\n' % nPoint).encode())
+        vtkFile.write(numpy.ones(nPoint, dtype='>i4').tobytes())
+        vtkFile.write(('\nPOINT_DATA %d\n' % nPoint).encode())
+        vtkFile.write(b'SCALARS scalars float 1\n')
+        vtkFile.write(b'LOOKUP_TABLE default\n')
+        vtkFile.write(pointLabels.astype('>f4').tobytes())
+        vtkFile.write(b'\n')
 
     return filename
 
@@ -142,4 +142,8 @@ Summary
 
 from bq3d.io.io import *
 
-
+# register core formats up front, formats backed by vtk, h5py or pandas are registered on first use
+from bq3d.io import TIF, NPY, FileList
+registerFileTypeModule('TIF', TIF)
+registerFileTypeModule('NPY', NPY)
+registerFileTypeModule('FileList', FileList)
@@ -8,12 +8,11 @@ See :mod:`bq3d.io` for details.
 
 """
 
-import sys
-
 import os
 import re
 import numpy
 import importlib
+import functools
 import shutil
 from pathlib import Path
 
@@ -21,7 +20,6 @@ from bq3d.utils.chunking import range_to_slices
 
 import logging
 log = logging.getLogger(__name__)
-self = sys.modules[__name__]
 
 pointFileExtensions = ['csv', 'txt', 'npy', 'vtk', 'ims', 'json']
 """list of extensions supported as a point data file"""
@@ -33,8 +31,7 @@ pointFileExtensionToType = {'csv' : 'CSV', 'txt' : 'CSV', 'npy' : 'NPY', 'vtk' :
                             'ims' : 'Imaris', 'json': 'json'}
 """map from point file extensions to point file types"""
 
-dataFileExtensions = ['tif', 'tiff', 'mhd', 'raw', 'zraw', 'ims', 'nrrd', 'npy', 'NPY', 'csv',
-                      'json']
+dataFileExtensions = ['tif', 'tiff', 'mhd', 'raw', 'zraw', 'ims', 'nrrd', 'npy', 'csv', 'json']
 """list of extensions supported as a image data file"""
 
 dataFileTypes = ['FileList', 'TIF', 'RAW', 'NRRD', 'Imaris', 'NPY', 'CSV','json']
@@ -48,13 +45,16 @@ dataFileExtensionToType = { 'tif' : 'TIF', 'tiff' : 'TIF', 'raw' : 'RAW', 'zraw'
                             'json': 'json', 'csv' : 'CSV'}
 """map from image file extensions to image file types"""
 
+_fileExpressionRegex = re.compile(r'\{\d+(?:,\d*)?\}')
+"""matches the digit quantifier of a file list expression, e.g. {4} or {3,4}"""
+
 
 ##############################################################################
 # Basic file queries
 ##############################################################################
 
 def fileExtension(filename):
-    """Returns file extension if exists
+    """Returns the lower case file extension if exists
     
     Arguments:
         filename (str): file name
@@ -63,16 +63,16 @@ def fileExtension(filename):
         str: file extension or None
     """
 
-    if isinstance(filename, Path):
-        filename = filename.as_posix()
+    if isinstance(filename, os.PathLike):
+        filename = os.fspath(filename)
     elif not isinstance(filename, str):
         return None
 
-    fext = filename.split('.')
-    if len(fext) < 2:
+    i = filename.rfind('.')
+    if i < 0:
         return None
     else:
-        return fext[-1]
+        return filename[i+1:].lower()
 
 
 def isFile(source):
@@ -110,14 +110,10 @@ def isFileExpression(source):
     if not isinstance(source, str):
         return False
 
-    if isFile(source):
+    if _fileExpressionRegex.search(source) is None:
         return False
     else:
-        m = re.search('{[\d,]+}', source)
-        if m is None:
-            return False
-        else:
-            return True
+        return not isFile(source)
 
 
 def isDataFile(source):
@@ -133,11 +129,7 @@ def isDataFile(source):
     if not isinstance(source, str):
         return False
 
-    fext = fileExtension(source)
-    if fext in dataFileExtensions:
-        return True
-    else:
-        return False
+    return fileExtension(source) in dataFileExtensionToType
 
 
 def isMappable(source):
@@ -182,13 +174,14 @@ def createDirectory(filename):
         str: directory name
     """       
     
-    dirname, fname = os.path.split(filename)
-    if not os.path.exists(dirname) and dirname != '':
-        os.makedirs(dirname)
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
 
     return dirname
 
 
+@functools.lru_cache(maxsize=4096)
 def pointFileNameToType(filename):
     """Returns type of a point file
     
@@ -201,10 +194,10 @@ def pointFileNameToType(filename):
 
 
     fext = fileExtension(filename)
-    if fext in pointFileExtensions:
-        return pointFileExtensionToType[fext]
-    else:
-       raise RuntimeError('Cannot determine type of point file %s with extension %s' % (filename, fext))
+    ftype = pointFileExtensionToType.get(fext)
+    if ftype is None:
+        raise RuntimeError('Cannot determine type of point file %s with extension %s' % (filename, fext))
+    return ftype
 
 
 def dataFileNameToType(filename):
@@ -220,11 +213,18 @@ def dataFileNameToType(filename):
     if isFileExpression(filename):
         return 'FileList'
     else:
-        fext = fileExtension(filename)
-        if fext in dataFileExtensions:
-            return dataFileExtensionToType[fext]
-        else:
-           raise RuntimeError('Cannot determine type of data file %s with extension %s' % (filename, fext))
+        return _dataFileNameToExtensionType(filename)
+
+
+@functools.lru_cache(maxsize=4096)
+def _dataFileNameToExtensionType(filename):
+    """Returns image data type from the file extension, cached as it only depends on the name"""
+
+    fext = fileExtension(filename)
+    ftype = dataFileExtensionToType.get(fext)
+    if ftype is None:
+        raise RuntimeError('Cannot determine type of data file %s with extension %s' % (filename, fext))
+    return ftype
 
 
 def dataFileNameToModule(filename):
@@ -238,7 +238,7 @@ def dataFileNameToModule(filename):
     """          
     
     ft = dataFileNameToType(filename)
-    return importlib.import_module('bq3d.io.' + ft)
+    return fileTypeToModule(ft)
 
 
 def pointFileNameToModule(filename):
@@ -252,7 +252,40 @@ def pointFileNameToModule(filename):
     """ 
 
     ft = pointFileNameToType(filename)
-    return importlib.import_module('bq3d.io.' + ft)
+    return fileTypeToModule(ft)
+
+
+def fileTypeToModule(filetype):
+    """Return the module that handles io for a file type, importing it only on first use
+
+    Arguments:
+        filetype (str): file type in :const:`dataFileTypes` or :const:`pointFileTypes`
+
+    Returns:
+        object: sub-module that handles a specific file type
+    """
+
+    mod = _fileTypeModules.get(filetype)
+    if mod is None:
+        mod = importlib.import_module('bq3d.io.' + filetype)
+        registerFileTypeModule(filetype, mod)
+    return mod
+
+
+def registerFileTypeModule(filetype, module):
+    """Register the module that handles io for a file type
+
+    Arguments:
+        filetype (str): file type in :const:`dataFileTypes` or :const:`pointFileTypes`
+        module (object): sub-module that handles the file type
+    """
+
+    _fileTypeModules[filetype] = module
+
+
+_fileTypeModules = {}
+"""registry of io sub-modules by file type. Core formats are registered when :mod:`bq3d.io` is imported, formats
+with heavier dependencies on first use so only that lookup takes the import lock"""
 
 
 ##############################################################################
@@ -282,6 +315,10 @@ def dataSize(source, x = None, y = None, z = None, **args):
         raise RuntimeError('dataSize: argument not a string, tuple or array!')
 
 
+_dataSizeOfSource = dataSize
+"""alias of :func:`dataSize` for functions with a dataSize argument that shadows it"""
+
+
 def dataZSize(source, z = None, **args):
     """Returns size of the array in the third dimension, None if 2D data
            
@@ -330,30 +367,22 @@ def toDataRange(size, r = None):
     if isinstance(r, int) or isinstance(r, float):
         r = (r, r +1)
 
-    if r[0] is None:
-        r = (0, r[1])
-    if r[0] < 0:
-        if -r[0] > size:
-            r = (0, r[1])
-        else:
-            r = (size + r[0], r[1])
-    if r[0] > size:
-        r = (size, r[1])
-
-    if r[1] is None:
-        r = (r[0], size)
-    if r[1] < 0:
-        if -r[1] > size:
-            r = (r[0], 0)
-        else:
-            r = (r[0], size + r[1])
-    if r[1] > size:
-        r = (r[0], size)
+    lo, hi = r
+    if lo is None:
+        lo = 0
+    elif lo < 0:
+        lo = max(0, size + lo)
+    else:
+        lo = min(lo, size)
 
-    if r[0] > r[1]:
-        r = (r[0], r[0])
+    if hi is None:
+        hi = size
+    elif hi < 0:
+        hi = max(0, size + hi)
+    else:
+        hi = min(hi, size)
 
-    return r
+    return lo, max(lo, hi)
 
 
 def toDataSize(size, r = None):
@@ -447,22 +476,40 @@ def readData(source, **args):
     See Also:
         :meth:`writeData`
     """
-    if isinstance(source, Path):
-        source = source.as_posix()
+    handler = _readDataHandlers.get(type(source))
+    if handler is None: # subclasses and paths
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+            handler = _readDataFromFile
+        elif isinstance(source, str):
+            handler = _readDataFromFile
+        elif isinstance(source, numpy.memmap):
+            handler = _readDataFromMemmap
+        elif isinstance(source, numpy.ndarray):
+            handler = dataToRange
+        else:
+            log.exception('readData: cannot infer format of the requested data/file.')
+            raise RuntimeError
 
-    if isinstance(source, (str, numpy.memmap)):
-        log.debug(f'Reading {source}')
+    return handler(source, **args)
 
-    if source is None:
-        return None
-    elif isinstance(source, str):
-        mod = dataFileNameToModule(source)
-        return mod.readData(source, **args)
-    elif isinstance(source, numpy.ndarray) or isinstance(source, numpy.memmap):
-        return dataToRange(source, **args)
-    else:
-        log.exception('readData: cannot infer format of the requested data/file.')
-        raise RuntimeError
+
+def _readDataFromFile(source, **args):
+    log.debug(f'Reading {source}')
+    mod = dataFileNameToModule(source)
+    return mod.readData(source, **args)
+
+
+def _readDataFromMemmap(source, **args):
+    log.debug(f'Reading {source}')
+    return dataToRange(source, **args)
+
+
+_readDataHandlers = {str: _readDataFromFile,
+                     numpy.memmap: _readDataFromMemmap,
+                     numpy.ndarray: dataToRange,
+                     type(None): lambda source, **args: None}
+"""map from source type to the readData handler for that exact type"""
 
 
 def empty(filename, shape, dtype, **kwargs):
@@ -488,8 +535,8 @@ def writeData(sink, data, **kwargs):
     See Also:
         :func:`readData`
     """
-    if isinstance(sink, Path):
-        sink = sink.as_posix()
+    if isinstance(sink, os.PathLike):
+        sink = os.fspath(sink)
 
     if sink is None: # dont write but return the data
         log.debug('writeData recieved sink of None')
@@ -516,10 +563,31 @@ def copyFile(source, sink):
         :func:`copyData`, :func:`convertData`
     """ 
     
+    if hasattr(os, 'copy_file_range'):
+        dest = os.path.join(sink, os.path.basename(source)) if os.path.isdir(sink) else sink
+        try:
+            _copyFileRange(source, dest)
+            shutil.copymode(source, dest)
+            return sink
+        except OSError: # e.g. unsupported by the file system, fall back to a regular copy
+            pass
+
     shutil.copy(source, sink)
     return sink
 
 
+def _copyFileRange(source, sink):
+    """Copies file contents inside the kernel, allowing reflinks or server side copies where supported"""
+
+    with open(source, 'rb') as fsrc, open(sink, 'wb') as fdst:
+        remaining = os.fstat(fsrc.fileno()).st_size
+        while remaining > 0:
+            n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if n == 0: # e.g. unsupported for the source, or it shrank, do not leave a truncated copy
+                raise OSError('copy_file_range stopped with {} bytes of {} left to copy'.format(remaining, source))
+            remaining -= n
+
+
 def copyData(source, sink, **kwargs):
     """Copy a data file from source to sink, which can consist of multiple files
 
@@ -536,10 +604,10 @@ def copyData(source, sink, **kwargs):
         :func:`copyFile`, :func:`convertData`
     """     
 
-    if isinstance(source, Path):
-        source = source.as_posix()
-    if isinstance(sink, Path):
-        sink = sink.as_posix()
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    if isinstance(sink, os.PathLike):
+        sink = os.fspath(sink)
 
     mod = dataFileNameToModule(source)
     return mod.copyData(source, sink, **kwargs)
@@ -592,8 +660,7 @@ def toMultiChannelData(*args):
         array: concatenated multi-channel array
     """
     
-    data = numpy.array(args)
-    return data.rollaxis(data, 0, data.ndim)
+    return numpy.stack(args, axis = -1)
 
 
 ##############################################################################
@@ -680,13 +747,15 @@ def pointsToCoordinatesAndPropertiesFileNames(filename, propertiesPostfix = '_in
     """  
     
     if isinstance(filename, str):
-        return filename, filename[:-4] + propertiesPostfix + filename[-4:]
+        root, ext = os.path.splitext(filename)
+        return filename, root + propertiesPostfix + ext
     elif isinstance(filename, tuple):
         if len(filename) == 1:
             if filename[0] is None:
                 return None, None
             elif isinstance(filename[0], str):
-                return filename[0], filename[0][:-4] + propertiesPostfix + filename[0][-4:]
+                root, ext = os.path.splitext(filename[0])
+                return filename[0], root + propertiesPostfix + ext
             else:
                 raise RuntimeError('pointsFilenames: invalid filename specification!')
         elif len(filename) == 2:
@@ -711,7 +780,7 @@ def pointShiftFromRange(dataSize, x = None, y = None, z = None):
     """
     
     if isinstance(dataSize, str):
-        dataSize = self.dataSize(dataSize)
+        dataSize = _dataSizeOfSource(dataSize)
     dataSize = list(dataSize)
 
     d = len(dataSize)
@@ -728,7 +797,7 @@ def pointShiftFromRange(dataSize, x = None, y = None, z = None):
     return [r[0] for r in rr]
 
 
-def pointsToRange(points, dataSize = None, x = None, y = None, z = None, shift = False):
+def pointsToRange(points, dataSize = None, x = None, y = None, z = None, shift = False, isSorted = False):
     """Restrict points to a specific range
     
     Arguments:
@@ -736,6 +805,8 @@ def pointsToRange(points, dataSize = None, x = None, y = None, z = None, shift =
         dataSize (str): data size of the full image
         x,y,z (tuples or None): range specifications
         shift (bool): shift points to relative coordinates in the reduced image
+        isSorted (bool): points are sorted by their first coordinate, the range in that coordinate
+            is then found by binary search and only points inside it are tested
     
     Returns:
         tuple: points reduced in range and optionally shifted to the range reduced origin
@@ -762,24 +833,35 @@ def pointsToRange(points, dataSize = None, x = None, y = None, z = None, shift =
     if dataSize is None:
         dataSize = points.max(axis=0)
     elif isinstance(dataSize, str):
-        dataSize = self.dataSize(dataSize)
+        dataSize = _dataSizeOfSource(dataSize)
 
     rr = []
     if d > 0:
-        rr.append(self.toDataRange(dataSize[0], r = x))
+        rr.append(toDataRange(dataSize[0], r = x))
     if d > 1:
-        rr.append(self.toDataRange(dataSize[1], r = y))
+        rr.append(toDataRange(dataSize[1], r = y))
     if d > 2:
-        rr.append(self.toDataRange(dataSize[2], r = z))
+        rr.append(toDataRange(dataSize[2], r = z))
     if d > 3 or d < 1:
         raise RuntimeError('pointsToRange: dimension %d to big' % d)
 
-    if d > 0:
-        ids = numpy.logical_and(points[:,0] >= rr[0][0], points[:,0] < rr[0][1])
-    if d > 1:
-        ids = numpy.logical_and(numpy.logical_and(ids, points[:,1] >= rr[1][0]), points[:,1] < rr[1][1])
-    if d > 2:
-        ids = numpy.logical_and(numpy.logical_and(ids, points[:,2] >= rr[2][0]), points[:,2] < rr[2][1])
+    first = 0
+    if isSorted:
+        start, stop = numpy.searchsorted(points[:, 0], rr[0], side = 'left')
+        points = points[start:stop]
+        if not properties is None:
+            properties = properties[start:stop]
+        first = 1
+
+    # accumulate the mask column by column in preallocated buffers, no (n,d) temporaries
+    ids = numpy.ones(points.shape[0], dtype = bool)
+    tmp = numpy.empty(points.shape[0], dtype = bool)
+    for i in range(first, d):
+        lo, hi = rr[i]
+        numpy.greater_equal(points[:, i], lo, out = tmp)
+        ids &= tmp
+        numpy.less(points[:, i], hi, out = tmp)
+        ids &= tmp
 
     points = points[ids, :]
 
@@ -844,7 +926,7 @@ def readPoints(source, **args):
     elif isinstance(source[0], numpy.ndarray):
         points = source[0]
     elif isinstance(source[0], str):
-        mod = self.pointFileNameToModule(source[0])
+        mod = pointFileNameToModule(source[0])
         points = mod.readPoints(source[0])
 
     if source[1] is None:
@@ -852,13 +934,13 @@ def readPoints(source, **args):
     elif isinstance(source[1], numpy.ndarray):
         properties = source[1]
     elif isinstance(source[1], str):
-        mod = self.pointFileNameToModule(source[1])
+        mod = pointFileNameToModule(source[1])
         properties = mod.readPoints(source[1])
 
     if istuple:
-        return self.pointsToRange((points, properties), **args)
+        return pointsToRange((points, properties), **args)
     else:
-        return self.pointsToRange(points, **args)
+        return pointsToRange(points, **args)
 
 
 def writePoints(sink, points, **args):
@@ -876,12 +958,11 @@ def writePoints(sink, points, **args):
         :func:`readPoints`
     """ 
     
-    mod = self.pointFileNameToModule(sink)
-    abs_path = Path(sink).absolute()
-    if not Path(abs_path.parent).is_dir():
-        os.mkdir(abs_path.parent)
+    mod = pointFileNameToModule(sink)
+    abs_path = os.path.abspath(sink)
+    createDirectory(abs_path)
 
-    ret = mod.writePoints(abs_path.as_posix(), points)
+    ret = mod.writePoints(abs_path, points)
 
     return ret
 
@@ -897,10 +978,7 @@ def writeTable(filename, table):
         str: file name
     """
     with open(filename,'w') as f:
-        for sublist in table:
-            f.write(', '.join([str(item) for item in sublist]))
-            f.write('\n')
-        f.close()
+        f.writelines(', '.join(map(str, row)) + '\n' for row in table)
 
     return filename
 
@@ -1,6 +1,11 @@
 import json
 import numpy as np
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from bq3d._version import __version__
 __author__     = 'Ricardo Azevedo, Jack Zeitoun'
 __copyright__  = "Copyright 2019, Gandhi Lab"
@@ -14,21 +19,16 @@ __status__     = "Development"
 def writePoints(filename, data):
 
     if isinstance(data, np.ndarray):
-        out = {}
-        out['z'] = data[0]
-        out['y'] = data[1]
-        out['x'] = data[2]
+        data = {k: np.ascontiguousarray(data[:, i]) for i, k in enumerate(('z', 'y', 'x'))}
 
-    with open(filename, 'w') as f:
-        json.dump(data, f)
+    _dump(filename, data)
 
     return filename
 
 
 def readPoints(filename):
 
-    with open(filename) as json_file:
-        data = json.load(json_file)
+    data = _load(filename)
 
     if not {'z', 'y', 'x'} <= set(data):
         raise ValueError('z,y,x must be rpesent as keys in dict json')
@@ -38,15 +38,56 @@ def readPoints(filename):
 
 def writeData(filename, data):
 
-    with open(filename, 'w') as f:
-        json.dump(data, f)
+    _dump(filename, data)
 
     return filename
 
 
 def readData(filename):
 
-    with open(filename) as json_file:
-        data = json.load(json_file)
+    return _load(filename)
+
+
+def _dump(filename, data):
+    """Serialize data to json, with orjson encoding numpy arrays directly when it is installed"""
+
+    if orjson is not None:
+        with open(filename, 'wb') as f:
+            if isinstance(data, dict):
+                # encode one entry at a time so only a single column is held encoded in memory
+                f.write(b'{')
+                for i, (k, v) in enumerate(data.items()):
+                    if i > 0:
+                        f.write(b',')
+                    f.write(orjson.dumps(str(k)))
+                    f.write(b':')
+                    f.write(_orjsonDumps(v))
+                f.write(b'}')
+            else:
+                f.write(_orjsonDumps(data))
+    else: # json.dump streams the encoded chunks to the file
+        with open(filename, 'w') as f:
+            json.dump(data, f, default=_toList)
+
+
+def _orjsonDumps(data):
+
+    return orjson.dumps(data, default=_toList, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def _load(filename):
+
+    if orjson is not None:
+        with open(filename, 'rb') as f:
+            return orjson.loads(f.read())
+    else:
+        with open(filename) as f:
+            return json.load(f)
+
+
+def _toList(obj):
+    """Fallback for numpy objects the encoder can not serialize natively, e.g. non contiguous arrays"""
 
-    return data
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
@@ -6,6 +6,7 @@ volumetric image data.
 import os
 import numpy as np
 import shutil
+import threading
 import uuid
 from multiprocessing import Pool
 
@@ -13,11 +14,11 @@ from bq3d import config
 from bq3d import io
 from bq3d.utils.timer import Timer
 from bq3d.utils.files import unique_temp_dir
-from bq3d.utils.chunking import chunk_ranges
-from bq3d.stack_processing.parallelization import processSubStack
+from bq3d.utils.chunking import chunk_ranges, auto_chunk_size
+from bq3d.stack_processing.parallelization import processSubStack, prefetchSubStacks
 
 import logging
-from bq3d.utils.logger import set_console_level
+from bq3d.utils.logger import set_console_level, start_log_listener, init_worker_logging
 
 from bq3d._version import __version__
 __author__     = 'Ricardo Azevedo, Jack Zeitoun'
@@ -64,7 +65,7 @@ def process_flow(source,
                  min_sizes=(30, 30, 30),
                  aspect_ratio=(1, 10, 10),
                  output_properties = [],
-                 size=config.thread_ram_max,
+                 size=None,
                  sink=None,
                  processes=config.processes):
     """ Runs a workflow.
@@ -82,7 +83,7 @@ def process_flow(source,
         aspect_ratio (tuple): ratio to maintain between axis
         output_properties: (list): properties to include in output. See
         label_properties.region_props for more info
-        size (int): max total size of substack in Gb
+        size (int): max total size of substack in Gb. If None it is chosen from the available memory.
         sink (tuple): files to save detected cell info to.
             Coordinates will be saved to first file and properties segmented properties to second.
         processes (int): number of processes to use
@@ -93,36 +94,70 @@ def process_flow(source,
 
 
     temp_dir = unique_temp_dir('bq3d')
-    os.makedirs(temp_dir)
-    source_fn = temp_dir / (str(uuid.uuid4()) + '.tif')
-    log.verbose(f'Copying raw data to: {source_fn}')
 
     if len(output_properties) > 0 and output_properties[0] != 'centroid':
         output_properties.insert(0,'centroid')
 
-    source = io.copyData(source, source_fn, x=x, y=y, z=z)
+    # substacks are copied out of the source, so a whole single tif is used in place, other sources are copied to
+    # a tif first
+    if x is None and y is None and z is None and io.isFile(source) and io.dataFileNameToType(source) == 'TIF':
+        log.verbose(f'Using raw data in place: {source}')
+    else:
+        source_fn = temp_dir / (str(uuid.uuid4()) + '.tif')
+        log.verbose(f'Copying raw data to: {source_fn}')
+        source = io.copyData(source, source_fn, x=x, y=y, z=z)
+
+    if size is None:
+        size = auto_chunk_size(processes)
 
     unique_chunks, overlap_chunks = chunk_ranges(source, overlap=overlap, min_sizes=min_sizes,
                                                  aspect_ratio=aspect_ratio, size=size)
     log.verbose(f'Number of chunks: {len(unique_chunks)}')
 
-    argdata = [(flow, output_properties, source, overlap_chunks[i], unique_chunks[i], temp_dir)
+    argdata = [(i, (flow, output_properties, source, overlap_chunks[i], unique_chunks[i], temp_dir))
                for i in
                range(len(overlap_chunks))]
+
+    # substacks are copied in the background while earlier chunks are processed
+    slots = threading.Semaphore(processes)
+    stop = threading.Event()
+    substacks = prefetchSubStacks(argdata, slots, stop, depth=processes)
     try:
+        results = [None] * len(argdata)
         if processes == 1:
-            results = [processSubStack(*arg) for arg in argdata]
+            try:
+                for i, res in map(_processSubStack, substacks):
+                    results[i] = res
+                    slots.release()
+            finally:
+                # stop the prefetch if a chunk raises, closing it waits for the copy threads to shut down
+                stop.set()
+                slots.release()
+                substacks.close()
         else:
-            pool = Pool(processes=processes, maxtasksperchild=1)
-            results = pool.starmap(processSubStack, argdata)
-            pool.close()
+            # workers are reused across chunks, results arrive in completion order and are put back by chunk index
+            # workers pass their log records to this process so only one process writes the log files
+            log_queue, log_listener = start_log_listener()
+            try:
+                with Pool(processes=processes, maxtasksperchild=config.max_tasks_per_child,
+                          initializer=init_worker_logging, initargs=(log_queue,)) as pool:
+                    try:
+                        for i, res in pool.imap_unordered(_processSubStack, substacks):
+                            results[i] = res
+                            slots.release()
+                    finally:
+                        # a prefetch waiting for a slot has to return before the pool can shut down
+                        stop.set()
+                        slots.release()
+            finally:
+                log_listener.stop()
     except Exception as err:
         shutil.rmtree(temp_dir, ignore_errors=True)
         raise err
 
     # join results
     if len(output_properties) > 0:
-        results = join_points(results, unique_chunks, overlap_chunks)
+        results = join_points(results)
         results = jsonify_points(output_properties, results)
 
     shutil.rmtree(temp_dir, ignore_errors=True)
@@ -132,76 +167,76 @@ def process_flow(source,
     return results
 
 
-def join_points(results, unique_ranges, overlap_ranges):
-    """Joins a list of points obtained from processing a stack in chunks. converts coordinates to absolute based on range.
-    Only keeps points in given range.
+def _processSubStack(arg):
+    # points of each chunk are written to disk so only the joined points are held in memory
+    i, arg = arg
+    temp_dir = arg[5]
+    return i, processSubStack(*arg, sink=os.path.join(temp_dir, f'points_{i}.npy'))
+
+
+def join_points(results):
+    """Joins the points obtained from processing a stack in chunks.
 
     Arguments:
-        results (list): list of point results from the individual sub-processes.
-        unique_ranges (list): list of chunk indices of the unique portion of each chunk in form [[x_start,x_end],
-        [y_start,y_end],[z_start,z_end])
-        overlap_ranges: (list) list of chunk indices of the full chunk with overlap in form [[
-        x_start,x_end], [y_start,y_end],[z_start,z_end])
+        results (list): points of the individual sub-processes as arrays or npy files, see
+        :func:`~bq3d.stack_processing.parallelization.processSubStack`.
 
     Returns:
-       tuple: joined points, joined intensities
+       array: joined points with columns z, y, x followed by one column per property
     """
 
-    nchunks = len(results)
-
-    all_coords  = []
-    all_props   = []
+    # first pass: only the number of points of each chunk is needed
+    nrows = 0
+    ncols = 3
     for r in results:
-        if len(r) > 0:
-            all_coords.append(r[0])
-            all_props.append(r[1:])
+        points = _read_points(r)
+        nrows += len(points)
+        ncols = points.shape[1]
 
-    filtered_data = None
+    # second pass: copy the points of each chunk into a single preallocated array
+    filtered_data = np.empty((nrows, ncols), dtype=np.float64)
+    offset = 0
+    for r in results:
+        points = _read_points(r)
+        filtered_data[offset:offset + len(points)] = points
+        offset += len(points)
 
-    for i in range(nchunks):
-        coords = np.array(all_coords[i])
-        props  = np.array(all_props[i]).T
+    return filtered_data
 
-        if len(coords) > 0:
-            # covert to abs coordinates
-            min_coord = tuple(rng[0] for rng in unique_ranges[i])
-            max_coord = tuple(rng[1] for rng in unique_ranges[i])
-            coords = coords + tuple(rng[0] for rng in overlap_ranges[i])
 
-            # generate mask
-            mask = np.logical_and(coords >= min_coord, coords < max_coord)
-            mask = np.all(mask, axis=1)
+def _read_points(source):
+    if isinstance(source, np.ndarray):
+        return source
+    # read-only, the page cache is shared instead of marking the pages as writable
+    return io.readData(source, returnMemmap=True, mode='r')
 
-            # join data
-            data = np.concatenate((coords, props), axis=1)
-            data = data[mask]
 
-            if not isinstance(filtered_data, np.ndarray):
-                filtered_data = data
-            else:
-                filtered_data = np.concatenate((filtered_data, data), axis=0)
+def jsonify_points(keys, values):
+    """Converts joined points to a dict of columns keyed by property name, the centroid is split into z, y and x.
 
-    if not isinstance(filtered_data, np.ndarray):
-        return np.zeros((0, 3))
-    else:
-        return filtered_data.T.tolist()
+    Arguments:
+        keys (list): property names in column order
+        values (array): joined points as returned by :func:`join_points`
 
+    Returns:
+       dict: one contiguous array per column
+    """
 
-def jsonify_points(keys, values):
+    columns = np.ascontiguousarray(np.asarray(values).T)
 
     res = {}
     i = 0
     for k in keys:
         if k == 'centroid':
-            res['z'] = values[i]
-            res['y'] = values[i+1]
-            res['x'] = values[i+2]
+            res['z'] = columns[i]
+            res['y'] = columns[i+1]
+            res['x'] = columns[i+2]
             i += 3
         else:
-            res[k] = values[i]
+            res[k] = columns[i]
             i += 1
 
-    if i != len(values):
+    if i != len(columns):
         raise ValueError('Too many point properties for the number of keys')
 
     return res
@@ -1,6 +1,9 @@
 import os
 import shutil
 import uuid
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from bq3d.utils.timer import Timer
 from bq3d import io
 from bq3d.io.FileList import splitFileExpression
@@ -8,7 +11,7 @@ import logging
 
 from bq3d.utils.chunking import unique_slice
 from bq3d.utils.files import unique_temp_dir
-from bq3d.image_filters.functions import filter_image
+from bq3d.image_filters.functions import filter_image, writes_input
 from bq3d.analysis.label_properties import label_props
 
 from bq3d._version import __version__
@@ -24,7 +27,7 @@ log = logging.getLogger(__name__)
 
 #define the subroutine for the processing
 def processSubStack(flow, output_properties, source, overlap_indices, unique_indices,
-                    temp_dir_root):
+                    temp_dir_root, substack = None, sink = None):
     """ Helper to process stack in parallel
 
     Args:
@@ -39,9 +42,13 @@ def processSubStack(flow, output_properties, source, overlap_indices, unique_ind
         corresponding
             to the non-overlapping portion of the image being analyzed.
         temp_dir (str): temp dir to be used for processing.
+        substack (str or None): substack already copied by :func:`copySubStack`, it is removed with its
+            directory once processed. If None the substack is copied here.
+        sink (str or None): npy file to write the points to instead of returning them.
 
     Returns:
-
+        (array or str): points in the unique range of the chunk with columns z, y, x in absolute coordinates
+        followed by one column per property, or the sink they were written to.
     """
     timer = Timer()
 
@@ -49,21 +56,18 @@ def processSubStack(flow, output_properties, source, overlap_indices, unique_ind
     log.info(f'chunk ranges: z= {zRng}, y= {yRng}, x = {xRng}')
 
     #memMap routine
-    temp_dir = unique_temp_dir('run', path = temp_dir_root)
-    if not os.path.exists(temp_dir):
-        os.mkdir(temp_dir)
-
-    mmapFile = os.path.join(temp_dir, str(uuid.uuid4())) + '.tif'
-    log.info('Creating memory mapped substack at: {}'.format(mmapFile))
-
-    img = io.copyData(source, mmapFile, x=xRng, y=yRng, z=zRng, returnMemmap=True)
-
-    rawFile = os.path.join(temp_dir, str(uuid.uuid4())) + '.tif'
-    log.info('Creating raw substack at: {}'.format(rawFile))
-    raw = io.copyData(img.filename, rawFile, returnMemmap=True)
-
-    # if a flow
-    filtered_im = img
+    if substack is None:
+        substack = copySubStack(source, overlap_indices, temp_dir_root)
+    temp_dir = os.path.dirname(substack)
+    mmapFile = substack
+
+    # the raw data is only read, in passes over the planes, and is mapped read-only
+    raw = io.readData(mmapFile, mode='r', access='sequential')
+
+    # filters that write into their input, in memory or through its file name, run on a separate copy of the
+    # substack on disk so the raw data is left untouched for the label properties. Other filters read the raw
+    # substack and return a new image, so the copy is only made if such a filter gets the substack itself
+    filtered_im = raw
     for p in flow:
         params = dict(p)
         filter = params.pop('filter')
@@ -71,6 +75,11 @@ def processSubStack(flow, output_properties, source, overlap_indices, unique_ind
             save = params.pop('save')
         else:
             save = False
+        if filtered_im is raw and writes_input(filter):
+            filterFile = os.path.join(temp_dir, str(uuid.uuid4())) + '.tif'
+            log.info('Creating filter substack at: {}'.format(filterFile))
+            io.copyFile(mmapFile, filterFile)
+            filtered_im = io.readData(filterFile, mode='r+', access='sequential')
         filtered_im = filter_image(filter, filtered_im, temp_dir_root = temp_dir, **params)
 
         # save intermediate output
@@ -83,15 +92,102 @@ def processSubStack(flow, output_properties, source, overlap_indices, unique_ind
                 if not os.path.isfile(fname):
                     io.empty(fname, io.dataSize(source)[1:], filtered_im.dtype)
 
+            # the saved output is not read again during the run, keep it out of the page cache
             unique = filtered_im[unique_slice(overlap_indices, unique_indices)]
-            io.writeData(save, unique, substack=unique_indices)
+            io.writeData(save, unique, substack=unique_indices, dropCache=True)
 
     # get label properties and return
     if output_properties:
         props = label_props(raw, filtered_im, output_properties)
+        props = _uniquePoints(props, overlap_indices, unique_indices)
+        if sink is not None:
+            props = io.writePoints(sink, props)
     else:
         props = []
 
     shutil.rmtree(temp_dir, ignore_errors=True)
     timer.log_elapsed(prefix='Processed chunk')
     return props
+
+
+def _uniquePoints(props, overlap_indices, unique_indices):
+    """Converts label properties of a chunk starting with the centroid to an array of points in absolute
+    coordinates, keeping only points in the unique range of the chunk"""
+
+    overlap_indices = np.asarray(overlap_indices)
+    unique_indices = np.asarray(unique_indices)
+
+    # fill coordinates and properties into one array instead of concatenating them
+    n = len(props[0])
+    points = np.empty((n, 3 + len(props) - 1), dtype=np.float64)
+    coords = points[:, :3]
+    if n > 0:
+        coords[:] = props[0]
+        points[:, 3:] = np.asarray(props[1:], dtype=np.float64).T
+    coords += overlap_indices[:, 0]
+
+    mask = np.all((coords >= unique_indices[:, 0]) & (coords < unique_indices[:, 1]), axis=1)
+
+    return points[mask]
+
+
+def copySubStack(source, overlap_indices, temp_dir_root):
+    """ Copies the range of a chunk to a tif in a new temp dir
+
+    Args:
+        source (str): path to image file to analyse.
+        overlap_indices (tuple or list): list of indices as [start,stop] along each axis to copy.
+        temp_dir_root (str): dir to create the temp dir of the chunk in.
+
+    Returns:
+        (str): path to the substack
+    """
+
+    zRng, yRng, xRng = overlap_indices
+
+    temp_dir = unique_temp_dir('run', path = temp_dir_root)
+    mmapFile = os.path.join(temp_dir, str(uuid.uuid4())) + '.tif'
+    log.info('Creating memory mapped substack at: {}'.format(mmapFile))
+
+    io.copyData(source, mmapFile, x=xRng, y=yRng, z=zRng)
+    return mmapFile
+
+
+def prefetchSubStacks(argdata, slots, stop, depth, threads = 2):
+    """ Copies substacks in background threads ahead of their processing
+
+    Yields the arguments of :func:`processSubStack` with the copied substack appended, at most `depth` copies
+    are made ahead of the chunks handed out. A slot is acquired before each chunk is handed out and should be
+    released once it is processed, so substacks waiting on disk are bounded by the number of slots plus `depth`.
+
+    Args:
+        argdata (list): (index, arguments of processSubStack) of each chunk.
+        slots (threading.Semaphore): chunks that can be handed out before one is processed.
+        stop (threading.Event): stops handing out chunks when set, release a slot after setting it.
+        depth (int): number of substacks to copy ahead.
+        threads (int): number of threads copying substacks.
+
+    Yields:
+        (tuple): index, arguments of processSubStack
+    """
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        pending = deque()
+
+        def copy(i, arg):
+            source, overlap_indices, temp_dir_root = arg[2], arg[3], arg[5]
+            return i, arg + (copySubStack(source, overlap_indices, temp_dir_root),)
+
+        for i, arg in argdata:
+            pending.append(executor.submit(copy, i, arg))
+            if len(pending) >= depth:
+                slots.acquire()
+                if stop.is_set():
+                    return
+                yield pending.popleft().result()
+
+        while pending:
+            slots.acquire()
+            if stop.is_set():
+                return
+            yield pending.popleft().result()
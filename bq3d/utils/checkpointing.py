@@ -1,8 +1,6 @@
 import os
 import tempfile
-from collections import defaultdict
 import re
-import functools
 import pickle
 
 import logging
@@ -18,6 +16,9 @@ __status__     = "Development"
 
 log = logging.getLogger(__name__)
 
+_bufferSize = 1 << 20
+"""buffer size of checkpoint files, state data holds many small objects next to large arrays"""
+
 def writeCheckpoint(file, dt):
     """Writes data to pickle.
         Used for checkpointing.
@@ -32,12 +33,17 @@ def writeCheckpoint(file, dt):
         new_file, file = tempfile.mkstemp(suffix = '.json')
     #create destination folder if not exist
     path = os.path.dirname(file)
-    if path:
-        os.makedirs(os.path.dirname(file), exist_ok=True)
+    if path and not os.path.isdir(path):
+        os.makedirs(path, exist_ok=True)
 
     log.info('Writing state data to pickle: ' + file)
-    with open(file, 'wb') as handle:
+    # from protocol 5 (python 3.8) numpy arrays are written to the file from their own memory instead of
+    # being copied to bytes first. Written next to the checkpoint and renamed over it once complete, so an
+    # interrupted write does not leave a corrupted checkpoint
+    tmp = file + '.tmp'
+    with open(tmp, 'wb', buffering=_bufferSize) as handle:
         pickle.dump(dt, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, file)
 
     log.debug('Done writing state data')
     return file
@@ -98,9 +104,9 @@ def compareCheckpoint(file1, file2):
     """
     if os.path.isfile(file1) & os.path.isfile(file2):
         #load in pickle
-        with open(file1, 'rb') as handle:
+        with open(file1, 'rb', buffering=_bufferSize) as handle:
             db1 = pickle.load(handle)
-        with open(file2, 'rb') as handle:
+        with open(file2, 'rb', buffering=_bufferSize) as handle:
             db2 = pickle.load(handle)
         difference = compareDict(db1, db2)
 
@@ -120,7 +126,7 @@ def compareCheckpoint(file1, file2):
 ##############################################################################
 
 
-def compareDict(d1, d2, path=[], difference = {}, verbose = False):
+def compareDict(d1, d2, path=[], difference = None, verbose = False):
     """check for differences between two dicts.
         limitation- new entries in d2 will not be picked up.
 
@@ -135,23 +141,20 @@ def compareDict(d1, d2, path=[], difference = {}, verbose = False):
            dict: a dict of tuples in form 'entry with differences' : (value from d1, value from d2)
     """
 
-    for k in list(d1.keys()):
+    if difference is None:
+        difference = {}
+
+    for k, v in d1.items():
         if not k in d2:
              log.debug(k + " as key not in d2")
-        else:
-            if type(d1[k]) is dict: # enter nested dicts
-                pth = path + [k]
-                compareDict(d1[k],d2[k], path = pth, difference = difference)
-            else:
-                if d1[k] != d2[k]:
-                    if not path:
-                        difference[k] = (d1[k],d2[k])
-                    else:
-                        tempD = nested_dd()
-                        functools.reduce(lambda d,key: d[key],path,tempD).update({k:(d1[k],d2[k])}) # probably more efficient way of doing this
-
-                        tempD = nested_dd_to_dict(tempD) # convert back to regular dict to merge
-                        difference = merge_dicts(difference, tempD)
+        elif type(v) is dict: # enter nested dicts
+            compareDict(v, d2[k], path = path + [k], difference = difference)
+        elif v != d2[k]:
+            # add the entry to the nested dict of the path, created as needed
+            nested = difference
+            for key in path:
+                nested = nested.setdefault(key, {})
+            nested[k] = (v, d2[k])
 
     return difference
 
@@ -205,15 +208,3 @@ def merge_dicts(a, b, path=None):
         else:
             a[key] = b[key]
     return a
-
-def nested_dd():
-    # Creates a depault dic so that keys can be added without being first defined.
-
-    # Used by compareDict.
-    return defaultdict(nested_dd)
-
-def nested_dd_to_dict(d):
-    # converts dict created with nested_dd to dict.
-    if isinstance(d, defaultdict):
-        d = {k: nested_dd_to_dict(v) for k, v in list(d.items())}
-    return d
@@ -1,8 +1,15 @@
+import os
 import math
+import logging
 import numpy as np
 from typing import Union
 from itertools import product
 
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
 from bq3d import io
 from bq3d import config
 
@@ -15,6 +22,8 @@ __maintainer__ = 'Ricardo Azevedo'
 __email__      = 'ricardo-re-azevedo@gmail.com'
 __status__     = "Development"
 
+log = logging.getLogger(__name__)
+
 
 def range_to_slices(ranges:list):
     """ converts ranges to slice object
@@ -88,6 +97,27 @@ def unique_slice(img_rng, unique_rng):
     return range_to_slices(new_ranges)
 
 
+def auto_chunk_size(processes:int = config.processes, fraction:float = 0.6):
+    """ chooses the size of a substack from the memory currently available.
+
+    Args:
+        processes (int): number of substacks processed at the same time
+        fraction (float): fraction of the available memory shared by the substacks
+
+    Returns:
+        (float): size of substack in Gb, never smaller than config.thread_ram_max
+    """
+
+    if psutil is not None:
+        available = psutil.virtual_memory().available
+    else:
+        available = os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+
+    size = max(config.thread_ram_max, fraction * available / 10**9 / processes)
+    log.verbose(f'Substack size set to {size:.2f} Gb from {available / 10**9:.2f} Gb available memory')
+    return size
+
+
 def chunk_ranges(source:Union[str, np.ndarray],
                   overlap:int = 10,
                   min_sizes:tuple = (30,30,30),
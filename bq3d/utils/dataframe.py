@@ -15,14 +15,15 @@ log = logging.getLogger(__name__)
 
 
 def cleanup_df(df):
-    """downcasts numerical types and converts objects to categories"""
+    """downcasts numerical types and converts low cardinality objects to categories"""
     init_mem = mem_usage(df)
-    for c in df:
-        if str(df[c].dtype).startswith('int'):
-            df[c] = pd.to_numeric(df[c], downcast = 'unsigned')
-        if str(df[c].dtype).startswith('float'):
-            df[c] = pd.to_numeric(df[c], downcast = 'float')
-        if str(df[c].dtype).startswith('object'):
+    for c in df.select_dtypes(include='integer').columns:
+        df[c] = pd.to_numeric(df[c], downcast = 'unsigned')
+    for c in df.select_dtypes(include='floating').columns:
+        df[c] = pd.to_numeric(df[c], downcast = 'float')
+    for c in df.select_dtypes(include='object').columns:
+        # categories only save memory when values repeat
+        if df[c].nunique() <= 0.5 * len(df[c]):
             df[c] = df[c].astype('category')
     fin_mem = mem_usage(df)
     print(f'Reduced size from {init_mem} to {fin_mem}')
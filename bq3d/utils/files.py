@@ -1,5 +1,5 @@
 import re
-import uuid
+import tempfile
 from bq3d import config
 from pathlib import Path
 
@@ -14,14 +14,16 @@ __status__     = "Development"
 
 
 def unique_temp_dir(folder, path = config.temp_dir):
-    """ Creates a unique temp.
+    """ Creates a unique temp directory.
+
+    Arguments:
+        folder (str): prefix of the directory name
+        path (str): directory to create the temp directory in
+
+    Returns:
+        (Path): path of the created directory
     """
-    counter = 0
-    while True:
-        counter += 1
-        tpath = Path(path) / f'{folder}{uuid.uuid4()}'
-        if not tpath.exists():
-            return tpath
+    return Path(tempfile.mkdtemp(prefix=folder, dir=path))
 
 
 def sort(list:list):
@@ -33,6 +35,12 @@ def sort(list:list):
     Returns:
 
     """
-    convert = lambda text: int(text) if text.isdigit() else text
-    alphanum_key = lambda key: [convert(c) for c in re.split('([0-9]+)', key)]
-    return sorted(list, key=alphanum_key)
+    return sorted(list, key=_alphanum_key)
+
+
+def _alphanum_key(key):
+    # splits key into text and numbers so numbers are compared by value
+    return [int(c) if c.isdigit() else c for c in _alphanum_regex.split(key)]
+
+
+_alphanum_regex = re.compile('([0-9]+)')
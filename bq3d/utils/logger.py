@@ -1,8 +1,12 @@
 import os
+import copy
+import functools
 import logging
 import logging.config
+import logging.handlers
+import multiprocessing
 import yaml
-import inspect
+import sys
 
 import numpy as np
 
@@ -70,6 +74,30 @@ def enable_run_file_handler(file):
         log.warning('Unable to set up run log or file not defined')
 
 
+def start_log_listener():
+    """Moves writing of log records to a thread of this process, for worker processes set up with
+    :func:`init_worker_logging`. The listener should be stopped once the workers are done.
+
+    Returns:
+        tuple: queue to pass to :func:`init_worker_logging`, started QueueListener
+    """
+
+    queue = multiprocessing.Queue(-1)
+    root = logging.getLogger()
+    listener = logging.handlers.QueueListener(queue, *root.handlers, respect_handler_level=True)
+    listener.start()
+
+    return queue, listener
+
+
+def init_worker_logging(queue):
+    """Replaces the handlers of a worker process with one that sends records to the listener of the parent,
+    to be used as Pool initializer"""
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(queue)]
+
+
 def get_logger_config(file = None):
     """Get config from file and return as dict"""
 
@@ -81,15 +109,29 @@ def get_logger_config(file = None):
     else:
         confFile = file
 
-    if os.path.exists(confFile):
-        with open(confFile, 'rt') as f:
-            conf = yaml.safe_load(f.read())
-        return conf
-    else:
+    if not os.path.exists(confFile):
         return None
 
+    # parsed once per version of the file, callers modify the config and get a copy of the cached one
+    return copy.deepcopy(_read_logger_config(confFile, os.stat(confFile).st_mtime_ns))
+
+
+@functools.lru_cache(maxsize=4)
+def _read_logger_config(confFile, mtime):
+
+    with open(confFile, 'rt') as f:
+        return yaml.load(f.read(), Loader=_yamlLoader)
+
+
+# libyaml based loader if pyyaml was built with it
+_yamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+VERBOSE = 15
+"""level of logger.verbose, between debug and info"""
+
 
-def add_verbose_level(LEVEL = 15):
+def add_verbose_level(LEVEL = VERBOSE):
     """adds a verbose level that can be invoked with logger.verbose"""
 
     logging.addLevelName(LEVEL, "VERBOSE")
@@ -109,7 +151,7 @@ def set_console_level(level):
         if level == 'info':
             level = 20
         if level == 'verbose':
-            level = 15
+            level = VERBOSE
         if level == 'debug':
             level = 10
     elif isinstance(level, int):
@@ -139,7 +181,7 @@ def log_parameters(head=True, **kwargs):
         if isinstance(head, str):
             prefix = head
         else:
-            prefix = inspect.stack()[1][3] # gets function that called log_parameters
+            prefix = sys._getframe(1).f_code.co_name # gets function that called log_parameters
     else:
         prefix = ''
 
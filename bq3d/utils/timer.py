@@ -5,7 +5,7 @@ tools for timing functions
 
 import time
 import logging
-import inspect
+import sys
 log = logging.getLogger(__name__)
 
 from bq3d._version import __version__
@@ -46,16 +46,16 @@ class Timer(object):
             str or float: elapsed time
         """
         
-        t = time.time()
+        t = time.time() - self.time
 
-        if asstring:
-            t = self.format_elapsed(t - self.time)
-            if prefix:
-                return prefix + "| elapsed time: " + t
-            else:
-                return "Elapsed time: " + t
+        if not asstring:
+            return t
+
+        t = self.format_elapsed(t)
+        if prefix:
+            return prefix + "| elapsed time: " + t
         else:
-            return t - self.time
+            return "Elapsed time: " + t
 
     def log_elapsed(self, prefix = True):
         """Print elapsed time as formated string
@@ -67,7 +67,7 @@ class Timer(object):
             if isinstance(prefix, str):
                 head = prefix
             else:
-                head = inspect.stack()[1][3] # gets function that called log_parameters
+                head = sys._getframe(1).f_code.co_name # gets function that called log_elapsed
         else:
             head = ''
 
@@ -82,10 +82,8 @@ class Timer(object):
         Returns:
             str: time as hours:minutes:seconds
         """
-        m, s = divmod(t, 60)
-        h, m = divmod(m, 60)
-
-        return "%d:%02d:%02d" % (h, m, s)
+        t = int(t)
+        return "%d:%02d:%02d" % (t // 3600, t // 60 % 60, t % 60)
 
     def get_time(self, format= '%Y%m%d%H%M%S'):
         """return time as formatted to string
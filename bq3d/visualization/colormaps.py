@@ -1,4 +1,3 @@
-import random
 import logging
 import numpy as np
 
@@ -22,25 +21,17 @@ def grays_to_rand_rgb(source, output):
     if ftype == 'TIF':
 
         log.info(f'Generating random RGB imgage for {ftype}')
-        data = io.readData(source).astype(int)
+        data = io.readData(source)
+        if not np.issubdtype(data.dtype, np.integer):
+            data = data.astype(np.intp)
         max_label = int(np.max(data))
-        # create lut
-        lut_r = np.array(random.sample(list(range(0, max_label)), max_label))
-        lut_g = np.array(random.sample(list(range(0, max_label)), max_label))
-        lut_b = np.array(random.sample(list(range(0, max_label)), max_label))
-        # downsample to 8bit
-        lut_r = ((255 / max_label) * lut_r).astype(int)
-        lut_g = ((255 / max_label) * lut_g).astype(int)
-        lut_b = ((255 / max_label) * lut_b).astype(int)
-        # add 0 value
-        lut_r = np.insert(lut_r, 0, 0)
-        lut_g = np.insert(lut_g, 0, 0)
-        lut_b = np.insert(lut_b, 0, 0)
-
-        rgb_output = np.zeros(data.shape + (3,), dtype='uint8')
-        rgb_output[...,0] = lut_r[data]
-        rgb_output[...,1] = lut_g[data]
-        rgb_output[...,2] = lut_b[data]
+        # create lut, one random permutation of the labels per channel downsampled to 8bit
+        lut = np.zeros((max_label + 1, 3), dtype='uint8')
+        for c in range(3):
+            lut[1:, c] = (255 / max_label) * np.random.permutation(max_label)
+
+        # single lookup writing each rgb triple at once
+        rgb_output = lut[data]
 
         io.writeData(output, rgb_output, rgb = True)
 
@@ -0,0 +1,65 @@
+import numpy as np
+
+import unittest
+
+import os
+import pickle
+import shutil
+import tempfile
+
+from bq3d.utils.checkpointing import writeCheckpoint, compareCheckpoint
+
+from bq3d.utils.logger import set_console_level
+set_console_level(21)
+
+
+class Unpicklable(object):
+
+    def __reduce__(self):
+        raise RuntimeError('interrupted')
+
+
+class TestWriteCheckpoint(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'state', 'checkpoint.pickle')
+        self.state = {'step': 2, 'params': {'size': (3, 3, 3)}, 'results': np.arange(100.)}
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def load(self, file):
+        with open(file, 'rb') as handle:
+            return pickle.load(handle)
+
+    def test_write(self):
+        self.assertEqual(writeCheckpoint(self.file, self.state), self.file)
+        state = self.load(self.file)
+        self.assertEqual(state['params'], self.state['params'])
+        self.assertTrue(np.array_equal(state['results'], self.state['results']))
+        # only the checkpoint is left, not the temporary file it is written to
+        self.assertEqual(os.listdir(os.path.dirname(self.file)), [os.path.basename(self.file)])
+
+    def test_overwrite(self):
+        writeCheckpoint(self.file, self.state)
+        writeCheckpoint(self.file, {**self.state, 'step': 3})
+        self.assertEqual(self.load(self.file)['step'], 3)
+
+    def test_interrupted(self):
+        # a failed write leaves the previous checkpoint intact
+        writeCheckpoint(self.file, self.state)
+        with self.assertRaises(RuntimeError):
+            writeCheckpoint(self.file, {**self.state, 'step': 3, 'broken': Unpicklable()})
+        self.assertEqual(self.load(self.file)['step'], 2)
+
+    def test_compare(self):
+        other = os.path.join(self.dir, 'other.pickle')
+        state = {'step': 2, 'params': {'size': (3, 3, 3)}}
+        writeCheckpoint(self.file, state)
+        writeCheckpoint(other, {**state, 'step': 3})
+        self.assertEqual(compareCheckpoint(self.file, other), {'step': (2, 3)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,7 @@ from pathlib import Path
 import unittest
 
 import os
+import sys
 import shutil
 
 from bq3d.image_filters.filters.background_subtraction import RollingBackgroundSubtract, BackgroundSubtract
@@ -191,6 +192,44 @@ class TestDoG(unittest.TestCase):
         self.assertTrue(equal)
 
 
+class TestSeparableDoG(unittest.TestCase):
+    # the separable gaussians must match the full DoG kernel, tiled or not
+
+    def setUp(self):
+        self.data = np.random.RandomState(0).randint(0, 4096, size=(24, 40, 36)).astype(np.uint16)
+        self.params = {'size': (7, 9, 9), 'sigma': (1, 1.5, 1.5), 'sigma2': (2, 3, 3)}
+
+    def dog(self, data, **extra_kwargs):
+        im_filter = DoG()
+        im_filter.set_inputs({**{'input': data}, **self.params, **extra_kwargs})
+        return im_filter.run()
+
+    def test_3d_uint16(self):
+        kernel = self.dog(self.data, use_kernel=True)
+        separable = self.dog(self.data)
+        self.assertEqual(separable.dtype, np.float32)
+        self.assertTrue(np.allclose(separable, kernel, rtol=1e-4, atol=1e-2))
+
+    def test_2d_uint16(self):
+        self.params = {'size': (9, 9), 'sigma': (1.5, 1.5), 'sigma2': (3, 3)}
+        kernel = self.dog(self.data[0], use_kernel=True)
+        separable = self.dog(self.data[0])
+        self.assertEqual(separable.shape, self.data[0].shape)
+        self.assertTrue(np.allclose(separable, kernel, rtol=1e-4, atol=1e-2))
+
+    def test_3d_tiled(self):
+        dog_module = sys.modules[DoG.__module__]
+        untiled = self.dog(self.data)
+        tile_bytes = dog_module._tile_bytes
+        try:
+            # tiles of 5 planes, each with a halo of 3 planes on both sides
+            dog_module._tile_bytes = 5 * 4 * self.data.shape[1] * self.data.shape[2]
+            tiled = self.dog(self.data)
+        finally:
+            dog_module._tile_bytes = tile_bytes
+        self.assertTrue(np.array_equal(tiled, untiled))
+
+
 class TestErode(unittest.TestCase):
 
     def setUp(self):
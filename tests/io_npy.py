@@ -0,0 +1,70 @@
+import numpy as np
+
+import unittest
+
+import os
+import shutil
+import tempfile
+
+from bq3d import io
+
+from bq3d.utils.logger import set_console_level
+set_console_level(21)
+
+
+class TestNPY(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'points.npy')
+        self.points = np.random.RandomState(0).rand(50, 4) * 100
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_save(self):
+        self.assertEqual(io.writePoints(self.filename, self.points), self.filename)
+        self.assertTrue(np.array_equal(np.load(self.filename), self.points))
+
+    def test_save_memmap(self):
+        data_map = io.writeData(self.filename, self.points, returnMemmap=True)
+        self.assertIsInstance(data_map, np.memmap)
+        self.assertTrue(np.array_equal(np.load(self.filename), self.points))
+
+    def test_save_objects(self):
+        # no pickled objects are written
+        with self.assertRaises(ValueError):
+            io.writeData(self.filename, np.array([None, 1], dtype=object))
+
+    def test_read(self):
+        io.writePoints(self.filename, self.points)
+        data = io.readPoints(self.filename)
+        self.assertNotIsInstance(data, np.memmap)
+        self.assertTrue(np.array_equal(data, self.points))
+
+    def test_read_memmap(self):
+        io.writePoints(self.filename, self.points)
+        data = io.readData(self.filename, returnMemmap=True)
+        self.assertIsInstance(data, np.memmap)
+        # read-only unless r+ is requested
+        with self.assertRaises(ValueError):
+            data[0, 0] = -1
+
+    def test_read_memmap_r_plus(self):
+        io.writePoints(self.filename, self.points)
+        data = io.readData(self.filename, returnMemmap=True, mode='r+')
+        data[0, 0] = -1
+        data.flush()
+        del data
+        self.assertEqual(np.load(self.filename)[0, 0], -1)
+
+    def test_read_range(self):
+        points = self.points[:, :3]
+        io.writePoints(self.filename, points)
+        data = io.readPoints(self.filename, dataSize=(100, 100, 100), x=(10, 60), y=(20, 80), z=(0, 50))
+        mask = np.all((points >= (10, 20, 0)) & (points < (60, 80, 50)), axis=1)
+        self.assertTrue(np.array_equal(data, points[mask]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import numpy as np
+import tifffile as tif
+
+import unittest
+
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from bq3d import io
+import bq3d.io.TIF as TIF
+
+from bq3d.utils.logger import set_console_level
+set_console_level(21)
+
+
+class TestCompression(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.data = np.random.RandomState(0).randint(0, 4096, size=(6, 32, 48)).astype(np.uint16)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def round_trip(self, data, compression):
+        filename = os.path.join(self.dir, 'compressed.tif')
+        io.writeData(filename, data, compression=compression, returnMemmap=False)
+        with tif.TiffFile(filename) as t:
+            self.assertNotEqual(t.pages[0].compression, 1)
+        return io.readData(filename)
+
+    def test_3d_uint16_zlib(self):
+        out = self.round_trip(self.data, 'zlib')
+        self.assertTrue(np.array_equal(out, self.data))
+
+    def test_3d_uint16_zstd(self):
+        # falls back to zlib where the zstd codec is not available
+        out = self.round_trip(self.data, 'zstd')
+        self.assertTrue(np.array_equal(out, self.data))
+
+    def test_3d_float32_zlib(self):
+        data = self.data.astype(np.float32) / 7
+        out = self.round_trip(data, 'zlib')
+        self.assertTrue(np.array_equal(out, data))
+
+    def test_range(self):
+        self.round_trip(self.data, 'zlib')
+        filename = os.path.join(self.dir, 'compressed.tif')
+        self.assertTrue(np.array_equal(io.readData(filename, z=(1, 3)), self.data[1:3]))
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            io.writeData(os.path.join(self.dir, 'compressed.tif'), self.data, compression='lzw')
+
+
+class TestWrite(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, 'source.tif')
+        self.sink = os.path.join(self.dir, 'sink.tif')
+        self.data = np.random.RandomState(0).randint(0, 4096, size=(6, 32, 48)).astype(np.uint16)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def is_bigtiff(self, filename):
+        with tif.TiffFile(filename) as t:
+            return t.is_bigtiff
+
+    def test_classic(self):
+        io.writeData(self.sink, self.data, returnMemmap=False)
+        self.assertFalse(self.is_bigtiff(self.sink))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+    def test_bigtiff(self):
+        classic_size = TIF._classicTiffSize
+        try:
+            TIF._classicTiffSize = self.data.nbytes - 1
+            io.writeData(self.sink, self.data, returnMemmap=False)
+        finally:
+            TIF._classicTiffSize = classic_size
+        self.assertTrue(self.is_bigtiff(self.sink))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+    def test_chunks(self):
+        write_chunk_size = TIF._writeChunkSize
+        try:
+            # flush after every 2 planes
+            TIF._writeChunkSize = 2 * self.data[0].nbytes
+            out = io.writeData(self.sink, self.data)
+        finally:
+            TIF._writeChunkSize = write_chunk_size
+        self.assertTrue(np.array_equal(out, self.data))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+    def test_copy_map(self):
+        io.writeData(self.source, self.data, returnMemmap=False)
+        source = io.readData(self.source)
+        # the whole mapped tif is copied as a file
+        self.assertTrue(TIF._isTifMap(source))
+        out = io.writeData(self.sink, source)
+        self.assertTrue(np.array_equal(out, self.data))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+    def test_copy_map_range(self):
+        io.writeData(self.source, self.data, returnMemmap=False)
+        source = io.readData(self.source, z=(1, 4))
+        # only the range is written, not the file
+        self.assertFalse(TIF._isTifMap(source))
+        io.writeData(self.sink, source, returnMemmap=False)
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data[1:4]))
+
+    def test_copy_map_view(self):
+        io.writeData(self.source, self.data, returnMemmap=False)
+        source = io.readData(self.source).view(np.int16)
+        # a view as another type is written with that type, not copied as the file
+        self.assertFalse(TIF._isTifMap(source))
+        io.writeData(self.sink, source, returnMemmap=False)
+        sink = io.readData(self.sink)
+        self.assertEqual(sink.dtype, np.int16)
+        self.assertTrue(np.array_equal(sink, self.data.view(np.int16)))
+
+    def test_copy_data(self):
+        io.writeData(self.source, self.data, returnMemmap=False)
+        io.copyData(self.source, self.sink)
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+        io.copyData(self.source, self.sink, z=(2, 5))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data[2:5]))
+
+
+class TestCopyFile(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, 'source.tif')
+        self.sink = os.path.join(self.dir, 'sink.tif')
+        self.data = np.random.RandomState(0).randint(0, 4096, size=(6, 32, 48)).astype(np.uint16)
+        io.writeData(self.source, self.data, returnMemmap=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_copy(self):
+        io.copyFile(self.source, self.sink)
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+    @unittest.skipUnless(hasattr(os, 'copy_file_range'), 'os.copy_file_range not available')
+    def test_copy_stopped(self):
+        # a copy_file_range that stops early falls back to a regular copy instead of truncating the file
+        copy_file_range = os.copy_file_range
+        calls = []
+
+        def stopping_copy_file_range(src, dst, count, *args):
+            calls.append(count)
+            return copy_file_range(src, dst, min(count, 4096), *args) if len(calls) == 1 else 0
+
+        with mock.patch.object(os, 'copy_file_range', stopping_copy_file_range):
+            io.copyFile(self.source, self.sink)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(os.path.getsize(self.sink), os.path.getsize(self.source))
+        self.assertTrue(np.array_equal(io.readData(self.sink), self.data))
+
+
+if __name__ == '__main__':
+    unittest.main()
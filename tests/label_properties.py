@@ -0,0 +1,98 @@
+import numpy as np
+from scipy import ndimage as ndi
+
+import unittest
+
+import bq3d.analysis.label_properties as label_properties
+from bq3d.analysis.label_properties import label_props, region_props
+
+from bq3d.utils.logger import set_console_level
+set_console_level(21)
+
+# the batched label statistics must match the properties of the individual regions
+
+props = ['centroid', 'area', 'max', 'max_coord', 'mean', 'min', 'sum']
+
+
+def labeled_data(shape, seed=0):
+    random = np.random.RandomState(seed)
+    # few intensity levels so labels have several voxels at their maximum
+    img = random.randint(0, 8, size=shape).astype(np.uint16)
+    labels, _ = ndi.label(random.rand(*shape) > 0.7)
+    # leave gaps in the label values
+    labels[labels % 5 == 0] = 0
+    return img, labels.astype(np.int32)
+
+
+def region_values(img, labels):
+    values = [[] for _ in props]
+    for region in region_props(labels, img):
+        for i, prop in enumerate(props):
+            values[i].append(getattr(region, prop)())
+    return values
+
+
+class TestLabelProps(unittest.TestCase):
+
+    def compare(self, img, labels):
+        batched = label_props(img, labels, props)
+        expected = region_values(img, labels)
+        for prop, values, correct in zip(props, batched, expected):
+            self.assertEqual(len(values), len(correct), prop)
+            self.assertTrue(np.allclose(np.asarray(values, dtype=np.float64),
+                                        np.asarray(correct, dtype=np.float64)), prop)
+
+    def test_3d(self):
+        self.compare(*labeled_data((12, 30, 28)))
+
+    def test_2d(self):
+        self.compare(*labeled_data((40, 36), seed=1))
+
+    def test_3d_float32(self):
+        img, labels = labeled_data((12, 30, 28), seed=2)
+        self.compare(img.astype(np.float32) - 4, labels)
+
+    def test_3d_high_labels(self):
+        # few labels with sparse values in the millions, as numbered across planes and kept by the size filter
+        img, labels = labeled_data((12, 30, 28), seed=3)
+        values = np.unique(labels)[1:]
+        high = np.random.RandomState(3).choice(np.arange(1, 3000000), len(values), replace=False)
+        lookup = np.zeros(labels.max() + 1, dtype=np.int32)
+        lookup[values] = high
+        labels = lookup[labels]
+        lookup_size = label_properties._lookup_size
+        for size in (lookup_size, 0):
+            try:
+                # renumber the labels with a lookup table, or by sorting them
+                label_properties._lookup_size = size
+                self.compare(img, labels)
+            finally:
+                label_properties._lookup_size = lookup_size
+
+    def test_shapes(self):
+        img, labels = labeled_data((12, 30, 28), seed=4)
+        centroid, area, max_coord = label_props(img, labels, ['centroid', 'area', 'max_coord'])
+        n = len(np.unique(labels)) - 1
+        self.assertEqual(centroid.shape, (n, 3))
+        self.assertEqual(max_coord.shape, (n, 3))
+        self.assertEqual(area.shape, (n,))
+
+    def test_empty(self):
+        img = np.zeros((4, 10, 10), dtype=np.uint16)
+        labels = np.zeros((4, 10, 10), dtype=np.int32)
+        centroid, area = label_props(img, labels, ['centroid', 'area'])
+        self.assertEqual(len(centroid), 0)
+        self.assertEqual(len(area), 0)
+
+
+class TestRegionAreas(unittest.TestCase):
+
+    def test_areas(self):
+        img, labels = labeled_data((12, 30, 28), seed=5)
+        areas = np.bincount(labels.ravel())
+        for region in region_props(labels, img, areas=areas):
+            self.assertEqual(region.area(), np.count_nonzero(labels == region.label))
+
+
+if __name__ == '__main__':
+    unittest.main()